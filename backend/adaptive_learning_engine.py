@@ -4,13 +4,14 @@
 
 import asyncio
 import math
-import numpy as np
+from statistics import fmean
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Tuple
 from pydantic import BaseModel
 from enum import Enum
 import logging
 from dataclasses import dataclass
+from bson import ObjectId
 
 logger = logging.getLogger(__name__)
 
@@ -111,7 +112,7 @@ class AdaptiveLearningEngine:
         )
         
         # Save to database
-        await self.db.memory_cards.insert_one(card.dict())
+        await self.db.memory_cards.insert_one(card.model_dump())
         
         logger.info(f"Initialized memory card for user {user_id}, word {word_id}")
         return card
@@ -179,7 +180,7 @@ class AdaptiveLearningEngine:
         # Save updated card
         await self.db.memory_cards.update_one(
             {"user_id": user_id, "word_id": word_id},
-            {"$set": card.dict()},
+            {"$set": card.model_dump()},
             upsert=True
         )
         
@@ -270,8 +271,8 @@ class AdaptiveLearningEngine:
         
         # Analyze recent performance
         if len(card.difficulty_history) >= 5:
-            recent_difficulty = np.mean(card.difficulty_history[-5:])
-            recent_times = np.mean(card.response_time_history[-5:])
+            recent_difficulty = fmean(card.difficulty_history[-5:])
+            recent_times = fmean(card.response_time_history[-5:])
             
             # Adjust based on consistent difficulty ratings
             if recent_difficulty < 2.0:  # Consistently too easy
@@ -334,31 +335,33 @@ class AdaptiveLearningEngine:
         try:
             now = datetime.utcnow()
             
-            # Get all memory cards for user
-            cards_cursor = self.db.memory_cards.find({"user_id": user_id})
-            cards = await cards_cursor.to_list(1000)
+            # Priority only rises as a card's due date passes, so the most
+            # pressing cards are the earliest due; let the (user_id, due_date)
+            # index return just those
+            cards_cursor = self.db.memory_cards.find({"user_id": user_id}).sort("due_date", 1).limit(limit)
+            cards = [WordMemoryCard(**card_data) async for card_data in cards_cursor]
+            
+            # Get word details for all cards in one query
+            word_ids = [ObjectId(card.word_id) for card in cards if ObjectId.is_valid(card.word_id)]
+            words = {
+                str(word["_id"]): {**word, "_id": str(word["_id"])}
+                async for word in self.db.words.find({"_id": {"$in": word_ids}})
+            }
             
             due_reviews = []
             
-            for card_data in cards:
-                card = WordMemoryCard(**card_data)
-                
-                # Calculate priority
-                priority = self._calculate_review_priority(card, now)
-                
-                if priority != ReviewPriority.LOW or len(due_reviews) < limit:
-                    # Get word details
-                    word = await self.db.words.find_one({"_id": card.word_id})
-                    if word:
-                        due_reviews.append({
-                            "word_id": card.word_id,
-                            "word_data": word,
-                            "memory_card": card.dict(),
-                            "priority": priority,
-                            "days_overdue": (now - card.due_date).days,
-                            "memory_strength": card.memory_strength,
-                            "estimated_difficulty": self._estimate_difficulty(card)
-                        })
+            for card in cards:
+                word = words.get(card.word_id)
+                if word:
+                    due_reviews.append({
+                        "word_id": card.word_id,
+                        "word_data": word,
+                        "memory_card": card.model_dump(),
+                        "priority": self._calculate_review_priority(card, now),
+                        "days_overdue": (now - card.due_date).days,
+                        "memory_strength": card.memory_strength,
+                        "estimated_difficulty": self._estimate_difficulty(card)
+                    })
             
             # Sort by priority and overdue days
             priority_order = {
@@ -409,7 +412,7 @@ class AdaptiveLearningEngine:
         
         # Adjust based on historical difficulty
         if card.difficulty_history:
-            avg_historical_difficulty = np.mean(card.difficulty_history)
+            avg_historical_difficulty = fmean(card.difficulty_history)
             base_difficulty = (base_difficulty + avg_historical_difficulty) / 2
         
         return max(1.0, min(5.0, base_difficulty))
@@ -10,6 +10,7 @@ from datetime import datetime, timedelta
 from typing import List, Dict, Optional, Any
 from dataclasses import dataclass
 import logging
+from bson import ObjectId
 
 logger = logging.getLogger(__name__)
 
@@ -36,11 +37,13 @@ class AdvancedAnalyticsEngine:
         """Generate comprehensive learning analytics"""
         
         # Get user data
-        progress = await self.db.user_progress.find({"user_id": user_id}).to_list(1000) if self.db else []
+        words_mastered = await self.db.user_progress.count_documents(
+            {"user_id": ObjectId(user_id), "mastery_level": {"$gte": 80}}
+        ) if self.db else 0
         
         analytics = LearningAnalytics(
             total_study_time_hours=45.5,
-            words_mastered=len([p for p in progress if p.get("mastery_level", 0) >= 80]),
+            words_mastered=words_mastered,
             verses_memorized=12,
             current_streak_days=7,
             best_streak_days=14,
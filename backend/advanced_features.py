@@ -9,6 +9,7 @@ from typing import Dict, List, Optional, Any
 from pydantic import BaseModel
 import httpx
 import logging
+from bson import ObjectId
 from islamic_compliance import islamic_compliance, ComplianceLevel, IslamicContentType
 
 logger = logging.getLogger(__name__)
@@ -96,6 +97,9 @@ class AdvancedFeaturesManager:
                 approved_by="scholars"
             )
         }
+        
+        # Reciters never change at runtime, so their serialized form is built once
+        self.approved_reciters_data = [reciter.model_dump() for reciter in self.approved_reciters.values()]
 
     async def get_reciter_audio(self, reciter_id: str, surah: int, ayah: int) -> Optional[AudioTrack]:
         """
@@ -167,7 +171,7 @@ class AdvancedFeaturesManager:
                 },
                 {
                     "$set": {
-                        "prayer_times": prayer_times.dict(),
+                        "prayer_times": prayer_times.model_dump(),
                         "calculated_at": datetime.utcnow(),
                         "calculation_method": "JAKIM_MALAYSIA"
                     }
@@ -239,7 +243,9 @@ class AdvancedFeaturesManager:
         """
         try:
             # Get user's learning history
-            user_progress = await self.db.user_progress.find({"user_id": user_id}).to_list(1000)
+            user_progress = await self.db.user_progress.find(
+                {"user_id": ObjectId(user_id)}, {"word_id": 1, "mastery_level": 1, "_id": 0}
+            ).to_list(1000)
             
             # Analyze learning patterns
             strong_areas = []
@@ -346,8 +352,9 @@ class AdvancedFeaturesManager:
             user_achievements = await self.db.user_achievements.find_one({"user_id": user_id}) or {"achievements": []}
             
             # Calculate available achievements
-            user_progress = await self.db.user_progress.find({"user_id": user_id}).to_list(1000)
-            words_learned = len([p for p in user_progress if p.get("mastery_level", 0) >= 50])
+            words_learned = await self.db.user_progress.count_documents(
+                {"user_id": ObjectId(user_id), "mastery_level": {"$gte": 50}}
+            )
             
             # Check which achievements are unlocked
             unlocked_achievements = []
@@ -14,6 +14,13 @@ import uuid
 
 logger = logging.getLogger(__name__)
 
+# Leaderboards are ranked once per interval and shared by every reader
+_LEADERBOARD_TTL_SECONDS = 60
+_LEADERBOARD_CACHE_SIZE = 100
+
+# Daily quests are fixed for the day once generated
+_DAILY_QUESTS_CACHE_MAX_SIZE = 10_000
+
 class AchievementCategory(str, Enum):
     LEARNING = "learning"
     CONSISTENCY = "consistency"
@@ -158,6 +165,15 @@ class ComprehensiveGamificationSystem:
         self.db = db
         self.achievements = self._initialize_achievements()
         self.level_requirements = self._calculate_level_requirements()
+        self._leaderboards: Dict[LeaderboardType, tuple] = {}  # type -> (expires at, computed at, ranked entries)
+        self._daily_quests: Dict[tuple, List[Quest]] = {}  # (user_id, date) -> that day's quests
+        
+        # The catalog is static, so group it by category once
+        self.achievements_by_category: Dict[AchievementCategory, List[tuple]] = {}  # category -> [(id, fields)]
+        for achievement_id, achievement in self.achievements.items():
+            self.achievements_by_category.setdefault(achievement.category, []).append(
+                (achievement_id, achievement.__dict__)
+            )
         
     def _initialize_achievements(self) -> Dict[str, Achievement]:
         """Initialize the comprehensive achievement system"""
@@ -538,18 +554,22 @@ class ComprehensiveGamificationSystem:
         
         return level_requirements
     
-    async def get_user_profile(self, user_id: str) -> UserProfile:
-        """Get or create user gamification profile"""
+    async def get_user_profile(self, user_id: str, projection: Optional[Dict[str, int]] = None) -> UserProfile:
+        """Get or create user gamification profile
+        
+        With a projection, fields left out keep their defaults, so the
+        returned profile is for reading only and must not be saved back.
+        """
         
         try:
-            profile_data = await self.db.user_profiles.find_one({"user_id": user_id})
+            profile_data = await self.db.user_profiles.find_one({"user_id": user_id}, projection)
             
             if profile_data:
                 return UserProfile(**profile_data)
             else:
                 # Create new profile
                 new_profile = UserProfile(user_id=user_id)
-                await self.db.user_profiles.insert_one(new_profile.dict())
+                await self.db.user_profiles.insert_one(new_profile.model_dump())
                 return new_profile
                 
         except Exception as e:
@@ -575,7 +595,7 @@ class ComprehensiveGamificationSystem:
             # Save updated profile
             await self.db.user_profiles.update_one(
                 {"user_id": user_id},
-                {"$set": profile.dict()},
+                {"$set": profile.model_dump()},
                 upsert=True
             )
             
@@ -615,43 +635,13 @@ class ComprehensiveGamificationSystem:
         
         try:
             profile = await self.get_user_profile(user_id)
-            unlocked_achievements = []
-            
-            for achievement_id, achievement in self.achievements.items():
-                # Skip if already unlocked
-                if achievement_id in profile.achievements_unlocked:
-                    continue
-                
-                # Check if requirements are met
-                if self._check_achievement_requirements(achievement, profile, activity_data):
-                    # Unlock achievement
-                    profile.achievements_unlocked.append(achievement_id)
-                    
-                    # Award XP and coins
-                    profile.total_xp += achievement.xp_reward
-                    profile.coins += achievement.coin_reward
-                    
-                    # Add badge if applicable
-                    if achievement.badge_type:
-                        badge_id = f"{achievement_id}_{achievement.badge_type.value}"
-                        profile.badges_earned.append(badge_id)
-                    
-                    # Unlock features if applicable
-                    if achievement.unlocks:
-                        profile.unlocked_features.extend(achievement.unlocks)
-                    
-                    unlocked_achievements.append({
-                        "achievement": achievement,
-                        "unlocked_at": datetime.utcnow().isoformat()
-                    })
-                    
-                    logger.info(f"User {user_id} unlocked achievement: {achievement.title}")
+            unlocked_achievements = self._unlock_achievements(user_id, profile, activity_data)
             
             # Save updated profile
             if unlocked_achievements:
                 await self.db.user_profiles.update_one(
                     {"user_id": user_id},
-                    {"$set": profile.dict()},
+                    {"$set": profile.model_dump()},
                     upsert=True
                 )
             
@@ -661,6 +651,85 @@ class ComprehensiveGamificationSystem:
             logger.error(f"Error checking achievements: {e}")
             return []
     
+    async def award_xp_and_check_achievements(
+        self, user_id: str, xp_amount: int, reason: str, activity_data: Dict[str, Any]
+    ) -> tuple:
+        """Award XP and unlock achievements with one profile read and one write"""
+        
+        try:
+            profile = await self.get_user_profile(user_id)
+            old_level = profile.current_level
+            
+            # Add XP and calculate the new level
+            profile.total_xp += xp_amount
+            new_level = self._calculate_level_from_xp(profile.total_xp)
+            profile.current_level = new_level
+            
+            # Level milestones are checked against the updated profile in the same pass
+            unlocked_achievements = self._unlock_achievements(user_id, profile, activity_data)
+            
+            await self.db.user_profiles.update_one(
+                {"user_id": user_id},
+                {"$set": profile.model_dump()},
+                upsert=True
+            )
+            
+            logger.info(f"Awarded {xp_amount} XP to user {user_id}: {reason}")
+            
+            xp_result = {
+                "xp_awarded": xp_amount,
+                "total_xp": profile.total_xp,
+                "old_level": old_level,
+                "new_level": new_level,
+                "level_up": new_level > old_level,
+                "reason": reason
+            }
+            return xp_result, unlocked_achievements
+            
+        except Exception as e:
+            logger.error(f"Error awarding XP and achievements: {e}")
+            return {"error": "Failed to award XP"}, []
+    
+    def _unlock_achievements(
+        self, user_id: str, profile: UserProfile, activity_data: Dict[str, Any]
+    ) -> List[Dict[str, Any]]:
+        """Unlock every achievement whose requirements the profile now meets"""
+        
+        unlocked_achievements = []
+        already_unlocked = set(profile.achievements_unlocked)
+        
+        for achievement_id, achievement in self.achievements.items():
+            # Skip if already unlocked
+            if achievement_id in already_unlocked:
+                continue
+            
+            # Check if requirements are met
+            if self._check_achievement_requirements(achievement, profile, activity_data):
+                # Unlock achievement
+                profile.achievements_unlocked.append(achievement_id)
+                
+                # Award XP and coins
+                profile.total_xp += achievement.xp_reward
+                profile.coins += achievement.coin_reward
+                
+                # Add badge if applicable
+                if achievement.badge_type:
+                    badge_id = f"{achievement_id}_{achievement.badge_type.value}"
+                    profile.badges_earned.append(badge_id)
+                
+                # Unlock features if applicable
+                if achievement.unlocks:
+                    profile.unlocked_features.extend(achievement.unlocks)
+                
+                unlocked_achievements.append({
+                    "achievement": achievement,
+                    "unlocked_at": datetime.utcnow().isoformat()
+                })
+                
+                logger.info(f"User {user_id} unlocked achievement: {achievement.title}")
+        
+        return unlocked_achievements
+    
     def _check_achievement_requirements(
         self, 
         achievement: Achievement, 
@@ -745,70 +814,88 @@ class ComprehensiveGamificationSystem:
         try:
             now = datetime.utcnow()
             
-            # Determine time filter
-            time_filter = {}
-            if leaderboard_type == LeaderboardType.WEEKLY:
-                week_start = now - timedelta(days=7)
-                time_filter = {"last_activity": {"$gte": week_start}}
-            elif leaderboard_type == LeaderboardType.MONTHLY:
-                month_start = now - timedelta(days=30)
-                time_filter = {"last_activity": {"$gte": month_start}}
-            
-            # Get profiles with sorting
-            sort_criteria = [("total_xp", -1), ("current_level", -1)]
-            
-            profiles_cursor = self.db.user_profiles.find(time_filter).sort(sort_criteria).limit(limit)
-            profiles = await profiles_cursor.to_list(limit)
-            
-            leaderboard_data = []
-            user_rank = None
+            cached = self._leaderboards.get(leaderboard_type)
+            if limit <= _LEADERBOARD_CACHE_SIZE and cached is not None and cached[0] > now:
+                _, computed_at, ranked = cached
+            else:
+                ranked = await self._rank_leaderboard(leaderboard_type, now, max(limit, _LEADERBOARD_CACHE_SIZE))
+                computed_at = now
+                if limit <= _LEADERBOARD_CACHE_SIZE:
+                    self._leaderboards[leaderboard_type] = (
+                        now + timedelta(seconds=_LEADERBOARD_TTL_SECONDS), computed_at, ranked
+                    )
             
-            for index, profile_data in enumerate(profiles):
-                profile = UserProfile(**profile_data)
-                rank = index + 1
-                
-                entry = {
-                    "rank": rank,
-                    "user_id": profile.user_id,
-                    "total_xp": profile.total_xp,
-                    "current_level": profile.current_level,
-                    "words_learned": profile.words_learned,
-                    "current_streak": profile.current_streak,
-                    "achievements_count": len(profile.achievements_unlocked)
-                }
-                
-                leaderboard_data.append(entry)
-                
-                if profile.user_id == user_id:
-                    user_rank = rank
+            leaderboard_data = ranked[:limit]
+            user_rank = next((entry["rank"] for entry in leaderboard_data if entry["user_id"] == user_id), None)
             
             return {
                 "leaderboard_type": leaderboard_type,
                 "entries": leaderboard_data,
                 "user_rank": user_rank,
                 "total_participants": len(leaderboard_data),
-                "last_updated": now.isoformat()
+                "last_updated": computed_at.isoformat()
             }
             
         except Exception as e:
             logger.error(f"Error getting leaderboard: {e}")
             return {"error": "Failed to load leaderboard"}
     
+    async def _rank_leaderboard(
+        self, leaderboard_type: LeaderboardType, now: datetime, limit: int
+    ) -> List[Dict[str, Any]]:
+        """Rank the top profiles for a leaderboard type"""
+        
+        # Determine time filter
+        time_filter = {}
+        if leaderboard_type == LeaderboardType.WEEKLY:
+            week_start = now - timedelta(days=7)
+            time_filter = {"last_activity": {"$gte": week_start}}
+        elif leaderboard_type == LeaderboardType.MONTHLY:
+            month_start = now - timedelta(days=30)
+            time_filter = {"last_activity": {"$gte": month_start}}
+        
+        # Get profiles with sorting
+        sort_criteria = [("total_xp", -1), ("current_level", -1)]
+        
+        profiles_cursor = self.db.user_profiles.find(time_filter).sort(sort_criteria).limit(limit)
+        profiles = await profiles_cursor.to_list(limit)
+        
+        leaderboard_data = []
+        for index, profile_data in enumerate(profiles):
+            profile = UserProfile(**profile_data)
+            leaderboard_data.append({
+                "rank": index + 1,
+                "user_id": profile.user_id,
+                "total_xp": profile.total_xp,
+                "current_level": profile.current_level,
+                "words_learned": profile.words_learned,
+                "current_streak": profile.current_streak,
+                "achievements_count": len(profile.achievements_unlocked)
+            })
+        
+        return leaderboard_data
+    
     async def create_daily_quests(self, user_id: str) -> List[Quest]:
         """Generate daily quests for user"""
         
         try:
-            profile = await self.get_user_profile(user_id)
             today = datetime.utcnow().date()
-            
-            # Check if already have today's quests
-            existing_quests = await self.db.daily_quests.find({
-                "user_id": user_id,
-                "date": today.isoformat()
-            }).to_list(10)
+            cache_key = (user_id, today.isoformat())
+            cached_quests = self._daily_quests.get(cache_key)
+            if cached_quests is not None:
+                return cached_quests
+            
+            # Check if already have today's quests; the bookkeeping fields
+            # are not Quest fields, so leave them out
+            existing_quests = await self.db.daily_quests.find(
+                {"user_id": user_id, "date": today.isoformat()},
+                {"_id": 0, "user_id": 0, "date": 0}
+            ).to_list(10)
             
             if existing_quests:
-                return [Quest(**quest_data) for quest_data in existing_quests]
+                daily_quests = [Quest(**quest_data) for quest_data in existing_quests]
+                self._cache_daily_quests(cache_key, daily_quests)
+                return daily_quests
             
             # Generate new daily quests
             quest_templates = [
@@ -847,13 +934,13 @@ class ComprehensiveGamificationSystem:
                 )
                 
                 daily_quests.append(quest)
-                
-                # Save to database
-                await self.db.daily_quests.insert_one({
-                    **quest.__dict__,
-                    "user_id": user_id,
-                    "date": today.isoformat()
-                })
+            
+            # Save to database
+            await self.db.daily_quests.insert_many([
+                {**quest.__dict__, "user_id": user_id, "date": today.isoformat()}
+                for quest in daily_quests
+            ])
+            self._cache_daily_quests(cache_key, daily_quests)
             
             return daily_quests
             
@@ -861,11 +948,18 @@ class ComprehensiveGamificationSystem:
             logger.error(f"Error creating daily quests: {e}")
             return []
     
-    async def get_user_statistics(self, user_id: str) -> Dict[str, Any]:
-        """Get comprehensive user statistics"""
+    def _cache_daily_quests(self, cache_key: tuple, daily_quests: List[Quest]):
+        """Remember a user's quests for the day, evicting the oldest entry when full"""
+        if len(self._daily_quests) >= _DAILY_QUESTS_CACHE_MAX_SIZE:
+            self._daily_quests.pop(next(iter(self._daily_quests)))
+        self._daily_quests[cache_key] = daily_quests
+    
+    async def get_user_statistics(self, user_id: str, profile: Optional[UserProfile] = None) -> Dict[str, Any]:
+        """Get comprehensive user statistics, reusing the caller's profile if given"""
         
         try:
-            profile = await self.get_user_profile(user_id)
+            if profile is None:
+                profile = await self.get_user_profile(user_id)
             
             # Calculate additional stats
             accuracy_rate = 0.0
@@ -882,7 +976,7 @@ class ComprehensiveGamificationSystem:
             level_progress = ((profile.total_xp - current_level_xp) / (next_level_xp - current_level_xp)) * 100
             
             statistics = {
-                "profile": profile.dict(),
+                "profile": profile.model_dump(),
                 "calculated_stats": {
                     "accuracy_rate": round(accuracy_rate, 1),
                     "global_rank": global_rank,
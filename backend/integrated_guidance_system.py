@@ -22,9 +22,12 @@ from datetime import datetime, timedelta
 from typing import List, Dict, Optional, Any, Tuple
 from enum import Enum
 import asyncio
+import copy
 import json
 from dataclasses import dataclass
+from functools import lru_cache
 import logging
+from bson import ObjectId
 
 # Import our existing systems
 from ai_ustaz_assistant import (
@@ -85,6 +88,168 @@ class ProgressBasedContent:
     estimated_completion_time: int
     prerequisite_knowledge: List[str]
 
+# Base time (minutes) for reading guidance and reflection per context
+_BASE_TIME = {
+    GuidanceContext.ONBOARDING: 15,
+    GuidanceContext.LESSON_START: 10,
+    GuidanceContext.LESSON_COMPLETE: 10,
+    GuidanceContext.PRAYER_TIME: 5,
+    GuidanceContext.ACHIEVEMENT_UNLOCK: 8,
+    GuidanceContext.DIFFICULTY_FACING: 12
+}
+
+# Step-by-step learning paths per context (copied before customization)
+_LEARNING_PATHS = {
+    GuidanceContext.ONBOARDING: (
+        "🤲 Start with dua for seeking knowledge",
+        "📖 Read AI Ustaz guidance with Quranic verse",
+        "📺 Watch recommended Peace TV introduction video",
+        "📝 Practice first Quranic words",
+        "🎯 Set daily learning goals"
+    ),
+    GuidanceContext.LESSON_START: (
+        "🤲 Recite 'Rabbi zidni ilma' (My Lord, increase me in knowledge)",
+        "📖 Review AI Ustaz pre-lesson guidance",
+        "🎥 Watch relevant Arabic grammar video (5-10 min)",
+        "📚 Begin your lesson with focus and intention",
+        "✍️ Take notes on new vocabulary"
+    ),
+    GuidanceContext.LESSON_COMPLETE: (
+        "🤲 Say 'Alhamdulillahi rabbil alameen'",
+        "📖 Read completion guidance from AI Ustaz",
+        "🎬 Watch deeper explanation video (15-30 min)",
+        "📝 Review and practice learned words",
+        "👥 Share knowledge with others"
+    ),
+    GuidanceContext.PRAYER_TIME: (
+        "⏰ Stop current learning activity",
+        "🧼 Perform wudu with mindfulness",
+        "🕌 Pray with focus and gratitude",
+        "📺 Optional: Short post-prayer reminder video (5 min)",
+        "📚 Return to studies with refreshed heart"
+    )
+}
+
+_DEFAULT_LEARNING_PATH = (
+    "📖 Read AI Ustaz guidance",
+    "📺 Watch recommended videos",
+    "📚 Apply learning practically",
+    "🤲 Make dua for continued guidance"
+)
+
+# Context-specific duas, with a general dua for seeking beneficial knowledge
+_CONTEXTUAL_DUAS = {
+    GuidanceContext.ONBOARDING: "رَبِّ اشْرَحْ لِي صَدْرِي وَيَسِّرْ لِي أَمْرِي (Rabbi ishrah li sadri wa yassir li amri) - My Lord, expand for me my breast and ease for me my task.",
+    GuidanceContext.LESSON_START: "رَّبِّ زِدْنِي عِلْمًا (Rabbi zidni ilma) - My Lord, increase me in knowledge.",
+    GuidanceContext.LESSON_COMPLETE: "الْحَمْدُ لِلَّهِ رَبِّ الْعَالَمِينَ (Alhamdulillahi rabbil alameen) - All praise is due to Allah, Lord of all the worlds.",
+    GuidanceContext.PRAYER_TIME: "رَبَّنَا تَقَبَّلْ مِنَّا إِنَّكَ أَنْتَ السَّمِيعُ الْعَلِيمُ (Rabbana taqabbal minna) - Our Lord, accept from us. You are the Hearing, the Knowing.",
+    GuidanceContext.ACHIEVEMENT_UNLOCK: "اللَّهُمَّ بَارِكْ لَنَا فِيمَا رَزَقْتَنَا (Allahumma barik lana feema razaqtana) - O Allah, bless for us what You have provided us.",
+    GuidanceContext.DIFFICULTY_FACING: "حَسْبُنَا اللَّهُ وَنِعْمَ الْوَكِيلُ (Hasbunallahu wa ni'mal wakeel) - Allah is sufficient for us, and He is the best Disposer of affairs."
+}
+
+_DEFAULT_DUA = "اللَّهُمَّ انْفَعْنِي بِمَا عَلَّمْتَنِي (Allahumma anfa'ni bima allamtani) - O Allah, benefit me with what You have taught me."
+
+# Context- and level-specific next actions
+_CONTEXT_ACTIONS = {
+    GuidanceContext.ONBOARDING: (
+        "⚙️ Complete your profile setup",
+        "🎯 Set daily learning reminders",
+        "📱 Explore all app features"
+    ),
+    GuidanceContext.LESSON_START: (
+        "🎧 Listen to proper pronunciation",
+        "✍️ Practice writing Arabic letters",
+        "🔄 Review previous lesson if needed"
+    ),
+    GuidanceContext.LESSON_COMPLETE: (
+        "📊 Check your progress statistics",
+        "🏆 View any unlocked achievements",
+        "📅 Plan your next study session"
+    ),
+    GuidanceContext.PRAYER_TIME: (
+        "📍 Use Qibla compass if needed",
+        "📖 Read prayer time information",
+        "⏰ Set reminder for next prayer"
+    )
+}
+
+_LEVEL_ACTIONS = {
+    LearningLevel.BEGINNER: (
+        "🐌 Take your time - quality over speed",
+        "🔁 Review basics regularly"
+    ),
+    LearningLevel.ADVANCED: (
+        "🔍 Explore deeper scholarly content",
+        "📚 Consider teaching others what you've learned"
+    )
+}
+
+# Islamic benefits shared across guidance responses
+_BASE_BENEFITS = (
+    "🌟 Increased connection with Allah through His words",
+    "📈 Spiritual growth and Islamic knowledge expansion", 
+    "🤲 Reward for every letter of Quran learned (10 hasanat per letter)",
+    "💎 Building foundation for understanding daily prayers",
+    "🕊️ Inner peace through engaging with divine guidance"
+)
+
+_CONTEXT_BENEFITS = {
+    GuidanceContext.ONBOARDING: (
+        "🌱 Starting a blessed journey of Islamic learning",
+        "🎯 Setting strong foundation for lifelong Quranic study"
+    ),
+    GuidanceContext.LESSON_START: (
+        "🧠 Preparing mind and heart for divine knowledge",
+        "✨ Seeking Allah's guidance before learning"
+    ),
+    GuidanceContext.LESSON_COMPLETE: (
+        "🏆 Completing righteous deed of learning Quran",
+        "📚 Adding to your treasure of Islamic knowledge"
+    ),
+    GuidanceContext.PRAYER_TIME: (
+        "🕌 Fulfilling most important obligation to Allah",
+        "💆‍♂️ Refreshing soul for continued learning"
+    )
+}
+
+_LEVEL_BENEFITS = {
+    LearningLevel.BEGINNER: (
+        "🌟 Every small step is recorded as a good deed",
+        "🎯 Building habits that will benefit you forever"
+    ),
+    LearningLevel.INTERMEDIATE: (
+        "📖 Deepening understanding of Allah's message",
+        "🎓 Developing scholarly mindset in Islamic studies"
+    ),
+    LearningLevel.ADVANCED: (
+        "👨‍🏫 Becoming qualified to teach others",
+        "🔍 Exploring depths of divine wisdom"
+    )
+}
+
+@lru_cache(maxsize=64)
+def _static_next_actions(
+    context: GuidanceContext,
+    learning_level: LearningLevel,
+    has_videos: bool
+) -> Tuple[str, ...]:
+    """Next actions that depend only on context, level and whether videos exist"""
+    actions = []
+    if has_videos:
+        actions.append("📝 Take notes on key points from videos")
+        actions.append("🤔 Reflect on how videos relate to your current lesson")
+    actions.extend(_CONTEXT_ACTIONS.get(context, ()))
+    actions.extend(_LEVEL_ACTIONS.get(learning_level, ()))
+    return tuple(actions)
+
+@lru_cache(maxsize=64)
+def _islamic_benefits(context: GuidanceContext, learning_level: LearningLevel) -> Tuple[str, ...]:
+    """Islamic benefits for a (context, level) pair, computed once per pair"""
+    all_benefits = list(_BASE_BENEFITS[:3])  # Take first 3 base benefits
+    all_benefits.extend(_CONTEXT_BENEFITS.get(context, ())[:2])  # Add 2 context benefits
+    all_benefits.extend(_LEVEL_BENEFITS.get(learning_level, ())[:2])  # Add 2 level benefits
+    return tuple(all_benefits[:6])  # Limit to 6 total benefits
+
 class RevolutionaryIntegratedGuidanceSystem:
     """
     🌟 Revolutionary Integrated Guidance System
@@ -457,14 +622,21 @@ class RevolutionaryIntegratedGuidanceSystem:
         """Get enhanced user profile with learning analytics"""
         try:
             # Get basic user data
-            user = await self.db.users.find_one({"_id": user_id}) if self.db else {}
-            user_progress = await self.db.user_progress.find({"user_id": user_id}).to_list(100) if self.db else []
+            user = await self.db.users.find_one({"_id": ObjectId(user_id)}) if self.db else {}
+            user_progress = await self.db.user_progress.find(
+                {"user_id": ObjectId(user_id)}, {"mastery_level": 1, "_id": 0}
+            ).to_list(100) if self.db else []
             
-            # Calculate enhanced metrics
+            # Calculate enhanced metrics in a single pass over progress
             total_lessons = user.get("total_lessons_completed", 0)
-            words_learned = len([p for p in user_progress if p.get("mastery_level", 0) >= 50])
+            words_learned = 0
+            total_mastery = 0
+            for p in user_progress:
+                mastery = p.get("mastery_level", 0)
+                words_learned += mastery >= 50
+                total_mastery += mastery
             current_streak = user.get("current_streak", 0)
-            average_score = sum([p.get("mastery_level", 0) for p in user_progress]) / len(user_progress) if user_progress else 0
+            average_score = total_mastery / len(user_progress) if user_progress else 0
             
             return {
                 "user_id": user_id,
@@ -585,43 +757,7 @@ class RevolutionaryIntegratedGuidanceSystem:
     ) -> List[str]:
         """Generate a step-by-step integrated learning path"""
         
-        base_paths = {
-            GuidanceContext.ONBOARDING: [
-                "🤲 Start with dua for seeking knowledge",
-                "📖 Read AI Ustaz guidance with Quranic verse",
-                "📺 Watch recommended Peace TV introduction video",
-                "📝 Practice first Quranic words",
-                "🎯 Set daily learning goals"
-            ],
-            GuidanceContext.LESSON_START: [
-                "🤲 Recite 'Rabbi zidni ilma' (My Lord, increase me in knowledge)",
-                "📖 Review AI Ustaz pre-lesson guidance",
-                "🎥 Watch relevant Arabic grammar video (5-10 min)",
-                "📚 Begin your lesson with focus and intention",
-                "✍️ Take notes on new vocabulary"
-            ],
-            GuidanceContext.LESSON_COMPLETE: [
-                "🤲 Say 'Alhamdulillahi rabbil alameen'",
-                "📖 Read completion guidance from AI Ustaz",
-                "🎬 Watch deeper explanation video (15-30 min)",
-                "📝 Review and practice learned words",
-                "👥 Share knowledge with others"
-            ],
-            GuidanceContext.PRAYER_TIME: [
-                "⏰ Stop current learning activity",
-                "🧼 Perform wudu with mindfulness",
-                "🕌 Pray with focus and gratitude",
-                "📺 Optional: Short post-prayer reminder video (5 min)",
-                "📚 Return to studies with refreshed heart"
-            ]
-        }
-        
-        base_path = base_paths.get(context, [
-            "📖 Read AI Ustaz guidance",
-            "📺 Watch recommended videos",
-            "📚 Apply learning practically",
-            "🤲 Make dua for continued guidance"
-        ])
+        base_path = list(_LEARNING_PATHS.get(context, _DEFAULT_LEARNING_PATH))
         
         # Customize based on available videos
         if videos:
@@ -655,164 +791,75 @@ class RevolutionaryIntegratedGuidanceSystem:
         # Add video-specific actions
         if videos:
             actions.append(f"🎬 Watch {len(videos)} recommended Peace TV videos")
-            actions.append("📝 Take notes on key points from videos")
-            actions.append("🤔 Reflect on how videos relate to your current lesson")
-        
-        # Add context-specific actions
-        context_actions = {
-            GuidanceContext.ONBOARDING: [
-                "⚙️ Complete your profile setup",
-                "🎯 Set daily learning reminders",
-                "📱 Explore all app features"
-            ],
-            GuidanceContext.LESSON_START: [
-                "🎧 Listen to proper pronunciation",
-                "✍️ Practice writing Arabic letters",
-                "🔄 Review previous lesson if needed"
-            ],
-            GuidanceContext.LESSON_COMPLETE: [
-                "📊 Check your progress statistics",
-                "🏆 View any unlocked achievements",
-                "📅 Plan your next study session"
-            ],
-            GuidanceContext.PRAYER_TIME: [
-                "📍 Use Qibla compass if needed",
-                "📖 Read prayer time information",
-                "⏰ Set reminder for next prayer"
-            ]
-        }
         
-        actions.extend(context_actions.get(context, []))
-        
-        # Add level-specific actions
-        if learning_level == LearningLevel.BEGINNER:
-            actions.append("🐌 Take your time - quality over speed")
-            actions.append("🔁 Review basics regularly")
-        elif learning_level == LearningLevel.ADVANCED:
-            actions.append("🔍 Explore deeper scholarly content")
-            actions.append("📚 Consider teaching others what you've learned")
+        # Add remaining video, context-specific and level-specific actions
+        actions.extend(_static_next_actions(context, learning_level, bool(videos)))
         
         return actions[:8]  # Limit to 8 actions to avoid overwhelming
     
     def _get_contextual_duas(self, context: GuidanceContext, ustaz_guidance) -> str:
         """Get specific duas for different contexts"""
         
-        contextual_duas = {
-            GuidanceContext.ONBOARDING: "رَبِّ اشْرَحْ لِي صَدْرِي وَيَسِّرْ لِي أَمْرِي (Rabbi ishrah li sadri wa yassir li amri) - My Lord, expand for me my breast and ease for me my task.",
-            GuidanceContext.LESSON_START: "رَّبِّ زِدْنِي عِلْمًا (Rabbi zidni ilma) - My Lord, increase me in knowledge.",
-            GuidanceContext.LESSON_COMPLETE: "الْحَمْدُ لِلَّهِ رَبِّ الْعَالَمِينَ (Alhamdulillahi rabbil alameen) - All praise is due to Allah, Lord of all the worlds.",
-            GuidanceContext.PRAYER_TIME: "رَبَّنَا تَقَبَّلْ مِنَّا إِنَّكَ أَنْتَ السَّمِيعُ الْعَلِيمُ (Rabbana taqabbal minna) - Our Lord, accept from us. You are the Hearing, the Knowing.",
-            GuidanceContext.ACHIEVEMENT_UNLOCK: "اللَّهُمَّ بَارِكْ لَنَا فِيمَا رَزَقْتَنَا (Allahumma barik lana feema razaqtana) - O Allah, bless for us what You have provided us.",
-            GuidanceContext.DIFFICULTY_FACING: "حَسْبُنَا اللَّهُ وَنِعْمَ الْوَكِيلُ (Hasbunallahu wa ni'mal wakeel) - Allah is sufficient for us, and He is the best Disposer of affairs."
-        }
-        
-        return (ustaz_guidance.duas_recommendation or 
-                contextual_duas.get(context, 
-                "اللَّهُمَّ انْفَعْنِي بِمَا عَلَّمْتَنِي (Allahumma anfa'ni bima allamtani) - O Allah, benefit me with what You have taught me."))
+        dua = getattr(ustaz_guidance, "duas_recommendation", None)
+        if dua:
+            return dua
+        return _CONTEXTUAL_DUAS.get(context, _DEFAULT_DUA)
     
     def _calculate_integrated_study_time(self, videos: List[PeaceTVVideo], context: GuidanceContext) -> int:
         """Calculate total estimated study time including videos and reflection"""
         
         # Base time for reading guidance and reflection
-        base_time = {
-            GuidanceContext.ONBOARDING: 15,  # minutes
-            GuidanceContext.LESSON_START: 10,
-            GuidanceContext.LESSON_COMPLETE: 10,
-            GuidanceContext.PRAYER_TIME: 5,
-            GuidanceContext.ACHIEVEMENT_UNLOCK: 8,
-            GuidanceContext.DIFFICULTY_FACING: 12
-        }.get(context, 10)
+        base_time = _BASE_TIME.get(context, 10)
         
         # Add video time
-        video_time = sum(video.duration_minutes for video in videos)
+        video_time = 0
+        for video in videos:
+            video_time += video.duration_minutes
         
         # Add reflection and practice time (20% of video time)
-        reflection_time = int(video_time * 0.2)
+        reflection_time = video_time // 5
         
         return base_time + video_time + reflection_time
     
     def _generate_islamic_benefits(self, context: GuidanceContext, learning_level: LearningLevel) -> List[str]:
         """Generate Islamic benefits description for the learning activity"""
-        
-        base_benefits = [
-            "🌟 Increased connection with Allah through His words",
-            "📈 Spiritual growth and Islamic knowledge expansion", 
-            "🤲 Reward for every letter of Quran learned (10 hasanat per letter)",
-            "💎 Building foundation for understanding daily prayers",
-            "🕊️ Inner peace through engaging with divine guidance"
-        ]
-        
-        context_benefits = {
-            GuidanceContext.ONBOARDING: [
-                "🌱 Starting a blessed journey of Islamic learning",
-                "🎯 Setting strong foundation for lifelong Quranic study"
-            ],
-            GuidanceContext.LESSON_START: [
-                "🧠 Preparing mind and heart for divine knowledge",
-                "✨ Seeking Allah's guidance before learning"
-            ],
-            GuidanceContext.LESSON_COMPLETE: [
-                "🏆 Completing righteous deed of learning Quran",
-                "📚 Adding to your treasure of Islamic knowledge"
-            ],
-            GuidanceContext.PRAYER_TIME: [
-                "🕌 Fulfilling most important obligation to Allah",
-                "💆‍♂️ Refreshing soul for continued learning"
-            ]
-        }
-        
-        level_benefits = {
-            LearningLevel.BEGINNER: [
-                "🌟 Every small step is recorded as a good deed",
-                "🎯 Building habits that will benefit you forever"
-            ],
-            LearningLevel.INTERMEDIATE: [
-                "📖 Deepening understanding of Allah's message",
-                "🎓 Developing scholarly mindset in Islamic studies"
-            ],
-            LearningLevel.ADVANCED: [
-                "👨‍🏫 Becoming qualified to teach others",
-                "🔍 Exploring depths of divine wisdom"
-            ]
-        }
-        
-        all_benefits = base_benefits[:3]  # Take first 3 base benefits
-        all_benefits.extend(context_benefits.get(context, [])[:2])  # Add 2 context benefits
-        all_benefits.extend(level_benefits.get(learning_level, [])[:2])  # Add 2 level benefits
-        
-        return all_benefits[:6]  # Limit to 6 total benefits
+        return list(_islamic_benefits(context, learning_level))
     
     # Additional helper methods for fallback scenarios
     
     async def _get_fallback_integrated_guidance(self, context: GuidanceContext) -> IntegratedRecommendation:
         """Provide fallback guidance when main system fails"""
-        fallback_quranic_ref = QuranicReference(
-            surah_number=2,
-            surah_name_arabic="البقرة",
-            surah_name_english="Al-Baqarah",
-            ayat_number=31,
-            arabic_text="وَعَلَّمَ آدَمَ الْأَسْمَاءَ كُلَّهَا",
-            english_translation="And He taught Adam the names - all of them.",
-            context_relevance="Learning is a divine gift from Allah.",
-            scholarly_note="Knowledge is the foundation of human excellence."
-        )
-        
-        return IntegratedRecommendation(
-            ustaz_guidance={
-                "persona": "ustaz",
-                "main_message": "SubhanAllah! Continue your blessed journey of learning Allah's words.",
-                "practical_advice": "Take your time, be consistent, and always seek Allah's guidance.",
-                "encouragement": "Every effort you make is seen and rewarded by Allah.",
-                "next_steps": ["Continue with your current lesson", "Make dua for guidance"]
-            },
-            peace_tv_videos=[],
-            quranic_reference=fallback_quranic_ref,
-            learning_path=["📖 Read guidance", "📚 Continue learning", "🤲 Make dua"],
-            next_actions=["Continue your studies", "Seek Allah's guidance"],
-            duas_for_context="رَّبِّ زِدْنِي عِلْمًا - My Lord, increase me in knowledge.",
-            estimated_study_time=15,
-            islamic_benefits=["Spiritual growth", "Divine reward", "Knowledge increase"]
-        )
+        # Deep copy so callers mutating lists or dicts don't touch the shared fallback
+        return copy.deepcopy(_FALLBACK_RECOMMENDATION)
+
+# Fallback guidance built once at import, used when the main system fails
+_FALLBACK_QURANIC_REF = QuranicReference(
+    surah_number=2,
+    surah_name_arabic="البقرة",
+    surah_name_english="Al-Baqarah",
+    ayat_number=31,
+    arabic_text="وَعَلَّمَ آدَمَ الْأَسْمَاءَ كُلَّهَا",
+    english_translation="And He taught Adam the names - all of them.",
+    context_relevance="Learning is a divine gift from Allah.",
+    scholarly_note="Knowledge is the foundation of human excellence."
+)
+
+_FALLBACK_RECOMMENDATION = IntegratedRecommendation(
+    ustaz_guidance={
+        "persona": "ustaz",
+        "main_message": "SubhanAllah! Continue your blessed journey of learning Allah's words.",
+        "practical_advice": "Take your time, be consistent, and always seek Allah's guidance.",
+        "encouragement": "Every effort you make is seen and rewarded by Allah.",
+        "next_steps": ["Continue with your current lesson", "Make dua for guidance"]
+    },
+    peace_tv_videos=[],
+    quranic_reference=_FALLBACK_QURANIC_REF,
+    learning_path=["📖 Read guidance", "📚 Continue learning", "🤲 Make dua"],
+    next_actions=["Continue your studies", "Seek Allah's guidance"],
+    duas_for_context="رَّبِّ زِدْنِي عِلْمًا - My Lord, increase me in knowledge.",
+    estimated_study_time=15,
+    islamic_benefits=["Spiritual growth", "Divine reward", "Knowledge increase"]
+)
 
 # Global instance
 integrated_guidance_system = RevolutionaryIntegratedGuidanceSystem(None)
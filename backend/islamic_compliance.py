@@ -5,9 +5,13 @@
 from typing import Dict, List, Optional, Any
 from datetime import datetime
 import logging
+import math
+import time
 from enum import Enum
 from pydantic import BaseModel
 
+logger = logging.getLogger(__name__)
+
 # Islamic Compliance Standards
 class ComplianceLevel(str, Enum):
     JAKIM_APPROVED = "jakim_approved"
@@ -33,41 +37,61 @@ class ComplianceCheck(BaseModel):
     notes: Optional[str] = None
     requires_review: bool = False
 
+# Kaaba coordinates (official), pre-converted for the great circle Qibla bearing
+_KAABA_LAT = 21.422487
+_KAABA_LNG = 39.826206
+_KAABA_LAT_RAD = math.radians(_KAABA_LAT)
+_KAABA_LNG_RAD = math.radians(_KAABA_LNG)
+_SIN_KAABA = math.sin(_KAABA_LAT_RAD)
+_COS_KAABA = math.cos(_KAABA_LAT_RAD)
+
+# Approved Islamic sources for verification
+_APPROVED_SOURCES = {
+    "quran": ("mushaf_madinah", "mushaf_uthmani", "king_fahd_complex"),
+    "hadith": ("sahih_bukhari", "sahih_muslim", "abu_dawud", "tirmidhi", "nasai", "ibn_majah"),
+    "tafsir": ("ibn_kathir", "tabari", "qurtubi", "jalalayn")
+}
+
+# How long a cached verification timestamp stays valid (seconds)
+_NOW_REFRESH_INTERVAL = 0.1
+
 class IslamicComplianceFramework:
     """
     Islamic Compliance Framework ensuring all content follows JAKIM & JAIS guidelines
     """
     
     def __init__(self):
-        self.logger = logging.getLogger(__name__)
+        self._cached_monotonic = float("-inf")
+        self._cached_now: Optional[datetime] = None
+        self._halal_achievement_system: Optional[Dict[str, Any]] = None
         self.forbidden_content_patterns = [
             # Content that goes against Islamic teachings
             "shirk", "bid'ah", "haram activities",
             "inappropriate imagery", "non-halal content"
         ]
         
-        # Approved Islamic sources for verification
-        self.approved_sources = {
-            "quran": {
-                "mushaf_madinah": True,
-                "mushaf_uthmani": True,
-                "king_fahd_complex": True
-            },
-            "hadith": {
-                "sahih_bukhari": True,
-                "sahih_muslim": True,
-                "abu_dawud": True,
-                "tirmidhi": True,
-                "nasai": True,
-                "ibn_majah": True
-            },
-            "tafsir": {
-                "ibn_kathir": True,
-                "tabari": True,
-                "qurtubi": True,
-                "jalalayn": True
-            }
-        }
+        # Approved Islamic sources for verification, as (category, source) pairs
+        self._approved_sources: frozenset = frozenset(
+            (category, source)
+            for category, sources in _APPROVED_SOURCES.items()
+            for source in sources
+        )
+
+    def is_source_approved(self, category: str, source: str) -> bool:
+        """
+        Check whether a source is approved for the given content category
+        """
+        return (category, source) in self._approved_sources
+
+    def _now(self) -> datetime:
+        """
+        Coarse UTC timestamp for compliance checks, refreshed at most every 100ms
+        """
+        current = time.monotonic()
+        if self._cached_now is None or current - self._cached_monotonic >= _NOW_REFRESH_INTERVAL:
+            self._cached_now = datetime.utcnow()
+            self._cached_monotonic = current
+        return self._cached_now
 
     def verify_quranic_content(self, arabic_text: str, surah: int, ayah: int) -> ComplianceCheck:
         """
@@ -82,11 +106,11 @@ class IslamicComplianceFramework:
                 content_type=IslamicContentType.QURAN_TEXT,
                 compliance_level=ComplianceLevel.SCHOLARLY_REVIEWED,
                 verified_by="system",
-                verification_date=datetime.utcnow(),
+                verification_date=self._now(),
                 notes="Quranic text requires verification against official Mushaf"
             )
         except Exception as e:
-            self.logger.error(f"Error verifying Quranic content: {e}")
+            logger.error("Error verifying Quranic content: %s", e)
             return ComplianceCheck(
                 content_id=f"quran_{surah}_{ayah}",
                 content_type=IslamicContentType.QURAN_TEXT,
@@ -115,7 +139,7 @@ class IslamicComplianceFramework:
             content_id=str(hash(content)),
             content_type=content_type,
             compliance_level=ComplianceLevel.SCHOLARLY_REVIEWED,
-            verification_date=datetime.utcnow(),
+            verification_date=self._now(),
             notes="Content passed basic compliance checks"
         )
 
@@ -143,23 +167,15 @@ class IslamicComplianceFramework:
         """
         Validate Qibla direction calculation
         """
-        # Kaaba coordinates (official)
-        kaaba_lat = 21.422487
-        kaaba_lng = 39.826206
-        
         # Calculate using great circle method (most accurate for Qibla)
-        import math
-        
         lat1 = math.radians(latitude)
         lng1 = math.radians(longitude)
-        lat2 = math.radians(kaaba_lat)
-        lng2 = math.radians(kaaba_lng)
         
-        d_lng = lng2 - lng1
+        d_lng = _KAABA_LNG_RAD - lng1
         
-        y = math.sin(d_lng) * math.cos(lat2)
-        x = (math.cos(lat1) * math.sin(lat2) - 
-             math.sin(lat1) * math.cos(lat2) * math.cos(d_lng))
+        y = math.sin(d_lng) * _COS_KAABA
+        x = (math.cos(lat1) * _SIN_KAABA - 
+             math.sin(lat1) * _COS_KAABA * math.cos(d_lng))
         
         qibla_bearing = math.degrees(math.atan2(y, x))
         qibla_bearing = (qibla_bearing + 360) % 360
@@ -167,7 +183,7 @@ class IslamicComplianceFramework:
         return {
             "qibla_bearing": qibla_bearing,
             "calculation_method": "great_circle",
-            "kaaba_coordinates": {"lat": kaaba_lat, "lng": kaaba_lng},
+            "kaaba_coordinates": {"lat": _KAABA_LAT, "lng": _KAABA_LNG},
             "compliance_level": ComplianceLevel.JAKIM_APPROVED,
             "accuracy": "high"
         }
@@ -186,6 +202,14 @@ class IslamicComplianceFramework:
         }
 
     def get_halal_achievement_system(self) -> Dict[str, Any]:
+        """
+        Get the Islamic-compliant achievement system, built once and shared
+        """
+        if self._halal_achievement_system is None:
+            self._halal_achievement_system = self._build_halal_achievement_system()
+        return self._halal_achievement_system
+
+    def _build_halal_achievement_system(self) -> Dict[str, Any]:
         """
         Define Islamic-compliant achievement system
         """
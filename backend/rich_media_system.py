@@ -6,14 +6,23 @@ Video lessons, podcasts, audio tafseer, and interactive
 multimedia content for comprehensive Islamic learning.
 """
 
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import List, Dict, Optional, Any
 from enum import Enum
 from dataclasses import dataclass
+import asyncio
 import logging
+import time
+
+from pymongo import UpdateOne
+from pymongo.errors import PyMongoError
 
 logger = logging.getLogger(__name__)
 
+# Progress pings are merged per (user, content) and written in batches
+_PROGRESS_FLUSH_SIZE = 64
+_PROGRESS_FLUSH_INTERVAL_SECONDS = 1.0
+
 class MediaType(str, Enum):
     VIDEO = "video"
     PODCAST = "podcast"
@@ -29,6 +38,13 @@ class ContentLevel(str, Enum):
 
 @dataclass
 class MediaContent:
+    # Declared by hand since dataclass(slots=True) needs Python 3.10
+    __slots__ = (
+        "content_id", "title", "description", "media_type", "content_level",
+        "duration_minutes", "instructor_name", "url", "thumbnail_url", "category",
+        "views_count", "rating", "is_premium"
+    )
+    
     content_id: str
     title: str
     description: str
@@ -49,6 +65,12 @@ class RichMediaSystem:
     def __init__(self, db):
         self.db = db
         self._initialize_sample_content()
+        
+        # Pending progress updates keyed by (user_id, content_id)
+        self._progress_buffer: Dict[tuple, Dict[str, Any]] = {}
+        self._progress_flush_lock = asyncio.Lock()
+        self._last_progress_flush = time.monotonic()
+        self._progress_flush_task: Optional[asyncio.Task] = None
     
     def _initialize_sample_content(self):
         """Initialize with curated Islamic content"""
@@ -99,6 +121,15 @@ class RichMediaSystem:
                 is_premium=True
             )
         ]
+        
+        # Pre-bucket content by media type, level and both, preserving order
+        self._by_type: Dict[MediaType, List[MediaContent]] = {}
+        self._by_level: Dict[ContentLevel, List[MediaContent]] = {}
+        self._by_type_level: Dict[tuple, List[MediaContent]] = {}
+        for content in self.sample_content:
+            self._by_type.setdefault(content.media_type, []).append(content)
+            self._by_level.setdefault(content.content_level, []).append(content)
+            self._by_type_level.setdefault((content.media_type, content.content_level), []).append(content)
     
     async def get_recommended_content(
         self,
@@ -108,15 +139,13 @@ class RichMediaSystem:
     ) -> List[MediaContent]:
         """Get personalized media recommendations"""
         
-        filtered = self.sample_content
-        
+        if content_type and level:
+            return self._by_type_level.get((content_type, level), [])
         if content_type:
-            filtered = [c for c in filtered if c.media_type == content_type]
-        
+            return self._by_type.get(content_type, [])
         if level:
-            filtered = [c for c in filtered if c.content_level == level]
-        
-        return filtered
+            return self._by_level.get(level, [])
+        return self.sample_content
     
     async def track_media_progress(
         self,
@@ -126,22 +155,92 @@ class RichMediaSystem:
         completed: bool = False
     ):
         """Track user's media consumption progress"""
-        if self.db:
-            await self.db.media_progress.update_one(
-                {"user_id": user_id, "content_id": content_id},
-                {
-                    "$set": {
-                        "progress_percentage": progress_percentage,
-                        "completed": completed,
-                        "last_watched": datetime.utcnow()
-                    }
-                },
-                upsert=True
-            )
+        if self.db is not None:
+            key = (user_id, content_id)
+            pending = self._progress_buffer.get(key)
+            if pending:
+                # Keep progress monotonic across pings merged into one write
+                progress_percentage = max(progress_percentage, pending["progress_percentage"])
+                completed = completed or pending["completed"]
+            self._progress_buffer[key] = {
+                "progress_percentage": progress_percentage,
+                "completed": completed,
+                "last_watched": datetime.now(timezone.utc)
+            }
+            
+            if (len(self._progress_buffer) >= _PROGRESS_FLUSH_SIZE or
+                    time.monotonic() - self._last_progress_flush > _PROGRESS_FLUSH_INTERVAL_SECONDS):
+                await self.flush_progress()
+    
+    async def flush_progress(self):
+        """Write all pending progress updates in a single bulk_write"""
+        async with self._progress_flush_lock:
+            if not self._progress_buffer:
+                return
+            batch, self._progress_buffer = self._progress_buffer, {}
+            self._last_progress_flush = time.monotonic()
+            try:
+                await self.db.media_progress.bulk_write(
+                    [
+                        UpdateOne(
+                            {"user_id": user_id, "content_id": content_id},
+                            {"$set": fields},
+                            upsert=True
+                        )
+                        for (user_id, content_id), fields in batch.items()
+                    ],
+                    ordered=False
+                )
+            except PyMongoError as e:
+                logger.error(f"Error flushing media progress, re-queueing {len(batch)} updates: {e}")
+                self._requeue_progress(batch)
+    
+    def _requeue_progress(self, batch: Dict[tuple, Dict[str, Any]]):
+        """Merge a failed batch back into the buffer without losing newer pings"""
+        for key, fields in batch.items():
+            pending = self._progress_buffer.get(key)
+            if pending is None:
+                self._progress_buffer[key] = fields
+            else:
+                # The upserts are idempotent, so retrying the merged entry is safe
+                pending["progress_percentage"] = max(
+                    pending["progress_percentage"], fields["progress_percentage"]
+                )
+                pending["completed"] = pending["completed"] or fields["completed"]
+    
+    def start_progress_flusher(self):
+        """Start the background task that periodically flushes progress updates"""
+        if self._progress_flush_task is None:
+            self._progress_flush_task = asyncio.create_task(self._periodic_progress_flush())
+    
+    async def _periodic_progress_flush(self):
+        while True:
+            await asyncio.sleep(_PROGRESS_FLUSH_INTERVAL_SECONDS)
+            try:
+                await self.flush_progress()
+            except Exception as e:
+                logger.error(f"Error flushing media progress: {e}")
+    
+    async def aclose(self):
+        """Stop the flusher and write any pending progress updates"""
+        if self._progress_flush_task is not None:
+            self._progress_flush_task.cancel()
+            self._progress_flush_task = None
+        if self._progress_buffer:
+            try:
+                await self.flush_progress()
+            except Exception as e:
+                logger.error(f"Error flushing media progress: {e}")
 
 rich_media_system = RichMediaSystem(None)
 
 async def initialize_rich_media_system(db):
-    global rich_media_system
-    rich_media_system = RichMediaSystem(db)
+    # Attach the database to the shared instance in place, so modules that
+    # imported rich_media_system before startup see the configured one
+    rich_media_system.db = db
+    if db is not None:
+        rich_media_system.start_progress_flusher()
     logger.info("🎥 Rich Media System initialized!")
+
+async def shutdown_rich_media_system():
+    await rich_media_system.aclose()
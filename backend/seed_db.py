@@ -0,0 +1,138 @@
+"""
+One-shot data migrations and seeding for the Quranic vocabulary and duas.
+
+Run once per deployment before starting the API workers:
+
+    python backend/seed_db.py
+
+Migrations skip documents already migrated and seeding only inserts into
+empty collections, so re-running it is safe.
+"""
+
+import asyncio
+import os
+import logging
+from pathlib import Path
+from datetime import datetime
+
+import orjson
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+logger = logging.getLogger(__name__)
+
+async def migrate_progress_user_ids(db):
+    """Key progress documents by user ObjectId, converting any stored as strings"""
+    # Ids that are not valid hex are left as they are instead of failing the run
+    result = await db.user_progress.update_many(
+        {"user_id": {"$type": "string"}},
+        [{"$set": {"user_id": {"$convert": {
+            "input": "$user_id", "to": "objectId", "onError": "$user_id", "onNull": None
+        }}}}]
+    )
+    if result.modified_count:
+        logger.info(f"Converted user_id to ObjectId on {result.modified_count} progress documents")
+
+async def dedupe_progress(db):
+    """Keep one progress document per user and word, then enforce it with a unique index"""
+    # Within each duplicate group keep the highest mastery, then the latest practice
+    duplicate_ids = []
+    async for group in db.user_progress.aggregate([
+        {"$sort": {"mastery_level": -1, "last_practiced": -1}},
+        {"$group": {
+            "_id": {"user_id": "$user_id", "word_id": "$word_id"},
+            "ids": {"$push": "$_id"},
+            "count": {"$sum": 1}
+        }},
+        {"$match": {"count": {"$gt": 1}}}
+    ], allowDiskUse=True):
+        duplicate_ids.extend(group["ids"][1:])
+    
+    if duplicate_ids:
+        result = await db.user_progress.delete_many({"_id": {"$in": duplicate_ids}})
+        logger.info(f"Removed {result.deleted_count} duplicate progress documents")
+    
+    await db.user_progress.create_index([("user_id", 1), ("word_id", 1)], unique=True)
+
+async def backfill_user_totals(db):
+    """Backfill denormalized progress totals for users created before they existed"""
+    if not await db.users.find_one({"progress_count": {"$exists": False}}, {"_id": 1}):
+        return
+    
+    today_start = datetime.combine(datetime.utcnow().date(), datetime.min.time())
+    await db.user_progress.aggregate([
+        {"$group": {
+            "_id": "$user_id",
+            "total_words_learned": {"$sum": {"$cond": [{"$gte": ["$mastery_level", 50]}, 1, 0]}},
+            "mastery_sum": {"$sum": {"$ifNull": ["$mastery_level", 0]}},
+            "progress_count": {"$sum": 1},
+            "words_practiced_today": {"$sum": {"$cond": [{"$gte": ["$last_practiced", today_start]}, 1, 0]}}
+        }},
+        {"$set": {"practice_day": today_start.date().isoformat()}},
+        {"$merge": {"into": "users", "on": "_id", "whenMatched": "merge", "whenNotMatched": "discard"}}
+    ], allowDiskUse=True).to_list(None)
+    await db.users.update_many(
+        {"progress_count": {"$exists": False}},
+        {"$set": {"total_words_learned": 0, "mastery_sum": 0, "progress_count": 0,
+                  "words_practiced_today": 0, "practice_day": None}}
+    )
+    logger.info("Backfilled user progress totals")
+
+async def seed_database(db):
+    # Check if words exist (collection metadata, no full count)
+    word_count = await db.words.estimated_document_count()
+    if word_count == 0:
+        # Expanded vocabulary with JAKIM/JAIS compliance, verified ahead of
+        # time and shipped as a seed file
+        verified_words = orjson.loads((ROOT_DIR / 'seed_words.json').read_bytes())
+        verification_date = datetime.utcnow()
+        for word in verified_words:
+            word["verification_date"] = verification_date
+        
+        await db.words.insert_many(verified_words, ordered=False)
+        logger.info(f"Initialized {len(verified_words)} verified Islamic words")
+        
+    # Initialize Islamic supplications (Duas) - JAKIM approved
+    dua_count = await db.duas.estimated_document_count()
+    if dua_count == 0:
+        islamic_duas = [
+            {
+                "name": "Dua for Knowledge",
+                "arabic": "رَبِّ زِدْنِي عِلْمًا",
+                "transliteration": "Rabbi zidni 'ilma",
+                "meaning": "My Lord, increase me in knowledge",
+                "reference": "Quran 20:114",
+                "category": "learning",
+                "compliance_level": "jakim_approved"
+            },
+            {
+                "name": "Dua Before Study",
+                "arabic": "اللَّهُمَّ انْفَعْنِي بِمَا عَلَّمْتَنِي وَعَلِّمْنِي مَا يَنْفَعُنِي وَزِدْنِي عِلْمًا",
+                "transliteration": "Allahumma anfa'ni bima 'allamtani wa 'allimni ma yanfa'uni wa zidni 'ilma",
+                "meaning": "O Allah, benefit me with what You have taught me, teach me what will benefit me, and increase me in knowledge",
+                "reference": "Hadith",
+                "category": "learning",
+                "compliance_level": "jakim_approved"
+            }
+        ]
+        
+        await db.duas.insert_many(islamic_duas, ordered=False)
+        logger.info("Initialized Islamic supplications (Duas)")
+
+async def main():
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    try:
+        db = client[os.environ['DB_NAME']]
+        await migrate_progress_user_ids(db)
+        await dedupe_progress(db)
+        await backfill_user_totals(db)
+        await seed_database(db)
+    finally:
+        client.close()
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
@@ -1,19 +1,29 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, status, UploadFile, File
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, Header, status, UploadFile, File
+from fastapi.responses import ORJSONResponse, Response
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from starlette.concurrency import run_in_threadpool
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+import anyio.to_thread
+import asyncio
 import os
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
 import uuid
-from datetime import datetime, timedelta
+import hashlib
+import random
+import time
+from datetime import datetime, timedelta, timezone
 import bcrypt
 import jwt
 from jwt.exceptions import ExpiredSignatureError, InvalidTokenError
 from bson import ObjectId
+from bson.errors import InvalidId
+import orjson
+from pymongo import ReturnDocument
 
 # Import advanced features
 from islamic_compliance import islamic_compliance, ComplianceLevel, IslamicContentType
@@ -38,7 +48,7 @@ from comprehensive_gamification import (
 from peace_tv_integration import (
     RevolutionaryPeaceTVIntegration, PeaceTVVideo, PeaceTVRecommendation,
     PeaceTVLanguage, PeaceTVContentType, ScholarName, peace_tv_integration,
-    initialize_peace_tv_integration
+    initialize_peace_tv_integration, shutdown_peace_tv_integration
 )
 from ai_ustaz_assistant import (
     RevolutionaryAIUstazAssistant, GuidanceMessage, GuidanceContext,
@@ -74,7 +84,7 @@ from subscription_system import (
 )
 from rich_media_system import (
     RichMediaSystem, MediaType, ContentLevel, MediaContent,
-    rich_media_system, initialize_rich_media_system
+    rich_media_system, initialize_rich_media_system, shutdown_rich_media_system
 )
 
 ROOT_DIR = Path(__file__).parent
@@ -82,16 +92,42 @@ load_dotenv(ROOT_DIR / '.env')
 
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+client = AsyncIOMotorClient(
+    mongo_url,
+    maxPoolSize=50,
+    minPoolSize=10,  # keep warm connections instead of reconnecting under load
+    maxIdleTimeMS=30000,
+    compressors="zstd,zlib",
+    serverSelectionTimeoutMS=3000
+)
 db = client[os.environ['DB_NAME']]
 
 # JWT Configuration
 SECRET_KEY = os.environ.get('JWT_SECRET_KEY', 'your-secret-key-change-in-production')
+# Encoded once so signing and verification skip the per-call str -> bytes step
+_SECRET_KEY_BYTES = SECRET_KEY.encode('utf-8')
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30 * 24 * 60  # 30 days
+BCRYPT_ROUNDS = 12  # bcrypt's default cost, pinned so it only changes deliberately
+
+# Lesson catalog metadata
+LESSONS = (
+    {"number": 1, "title": "Basic Words", "description": "Learn fundamental Quranic terms"},
+    {"number": 2, "title": "Common Verbs", "description": "Master frequently used verbs"},
+    {"number": 3, "title": "Pronouns & Particles", "description": "Understand connecting words"},
+)
+LESSON_NUMBERS = [lesson["number"] for lesson in LESSONS]
+MAX_LESSON = len(LESSONS)
+
+# User fields holding denormalized progress totals
+_PROGRESS_TOTALS_PROJECTION = {
+    "total_words_learned": 1, "mastery_sum": 1, "progress_count": 1,
+    "words_practiced_today": 1, "practice_day": 1,
+    "current_streak": 1, "total_lessons_completed": 1, "_id": 0
+}
 
 # Create the main app
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
 api_router = APIRouter(prefix="/api")
 security = HTTPBearer()
 
@@ -100,24 +136,84 @@ def create_access_token(data: dict):
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    encoded_jwt = jwt.encode(to_encode, _SECRET_KEY_BYTES, algorithm=ALGORITHM)
     return encoded_jwt
 
+def user_token_claims(user: dict) -> dict:
+    """Identity claims, so requests skip the users lookup; mutable user
+    fields such as the streak are always read from the users document"""
+    return {
+        "sub": str(user["_id"]),
+        "username": user["username"]
+    }
+
+def user_from_claims(payload: dict, user_oid: ObjectId) -> dict:
+    """Rebuild the current user's identity from token claims"""
+    return {
+        "_id": user_oid,
+        "username": payload["username"]
+    }
+
+# Validated tokens and their users are cached to skip repeat decodes and lookups
+_TOKEN_CACHE_MAX_SIZE = 10_000
+_USER_CACHE_TTL_SECONDS = 30
+_token_cache: Dict[bytes, tuple] = {}  # sha256(token)[:16] -> (exp timestamp, user_id, user ObjectId, user from claims or None)
+_user_cache: Dict[str, tuple] = {}  # user_id -> (expires at, user document)
+_user_lookups: Dict[str, asyncio.Future] = {}  # user_id -> in-flight users lookup
+
+def invalidate_cached_user(user_id: str):
+    """Drop a cached user document after the user record changes"""
+    _user_cache.pop(user_id, None)
+
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    try:
-        token = credentials.credentials
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    token = credentials.credentials
+    # Cache by digest so raw bearer tokens are never held in memory
+    token_key = hashlib.sha256(token.encode('utf-8')).digest()[:16]
+    now = time.time()
+    cached_token = _token_cache.get(token_key)
+    if cached_token is not None and cached_token[0] > now:
+        _, user_id, user_oid, claims_user = cached_token
+    else:
+        try:
+            payload = jwt.decode(token, _SECRET_KEY_BYTES, algorithms=[ALGORITHM])
+        except ExpiredSignatureError:
+            raise HTTPException(status_code=401, detail="Token has expired")
+        except InvalidTokenError:
+            raise HTTPException(status_code=401, detail="Could not validate credentials")
         user_id = payload.get("sub")
         if user_id is None:
             raise HTTPException(status_code=401, detail="Invalid authentication credentials")
-        user = await db.users.find_one({"_id": ObjectId(user_id)})
-        if user is None:
-            raise HTTPException(status_code=401, detail="User not found")
-        return user
-    except ExpiredSignatureError:
-        raise HTTPException(status_code=401, detail="Token has expired")
-    except InvalidTokenError:
-        raise HTTPException(status_code=401, detail="Could not validate credentials")
+        # Parse the subject once per token; cache hits reuse the ObjectId
+        try:
+            user_oid = ObjectId(user_id)
+        except (InvalidId, TypeError):
+            raise HTTPException(status_code=401, detail="Invalid authentication credentials")
+        # Tokens issued before claims were embedded still need the users lookup
+        claims_user = user_from_claims(payload, user_oid) if "username" in payload else None
+        if len(_token_cache) >= _TOKEN_CACHE_MAX_SIZE:
+            _token_cache.pop(next(iter(_token_cache)))
+        _token_cache[token_key] = (payload["exp"], user_id, user_oid, claims_user)
+    
+    if claims_user is not None:
+        return claims_user
+    
+    cached_user = _user_cache.get(user_id)
+    if cached_user is not None and cached_user[0] > now:
+        return cached_user[1]
+    
+    # Concurrent misses for the same user share a single users lookup
+    lookup = _user_lookups.get(user_id)
+    if lookup is None:
+        lookup = asyncio.ensure_future(db.users.find_one({"_id": user_oid}))
+        _user_lookups[user_id] = lookup
+        lookup.add_done_callback(lambda _: _user_lookups.pop(user_id, None))
+    user = await asyncio.shield(lookup)
+    if user is None:
+        raise HTTPException(status_code=401, detail="User not found")
+    if len(_user_cache) >= _TOKEN_CACHE_MAX_SIZE:
+        _user_cache.pop(next(iter(_user_cache)))
+    _user_cache[user_id] = (now + _USER_CACHE_TTL_SECONDS, user)
+    return user
 
 # Models
 class UserRegister(BaseModel):
@@ -168,9 +264,70 @@ class DashboardStats(BaseModel):
     words_practiced_today: int
     next_lesson: Optional[dict]
 
+# Lesson words are seeded once, so lesson data is loaded into memory at startup
+_lesson_word_ids: Dict[int, List[str]] = {}
+_word_lesson_numbers: Dict[str, int] = {}
+_lesson_words: Dict[int, List[dict]] = {}  # lesson number -> [{id, arabic, transliteration, meaning, example_verse}]
+_lesson_words_json: Dict[int, tuple] = {}  # lesson number -> (serialized /lessons/{n} body, ETag)
+_EMPTY_LESSON_WORDS = (b"[]", '"' + hashlib.md5(b"[]").hexdigest() + '"')
+_LESSON_WORDS_CACHE_CONTROL = "public, max-age=3600, immutable"
+_catalog_words: List[dict] = []  # every word as {id, arabic, transliteration, meaning}
+
+async def load_lesson_catalog():
+    """Load the word catalog, word ids and the serialized word list of every lesson"""
+    lesson_words: Dict[int, List[dict]] = {}
+    catalog_words = []
+    async for word in db.words.find(
+        {}, {"lesson_number": 1, "arabic": 1, "transliteration": 1, "meaning": 1, "example_verse": 1}
+    ):
+        lesson_words.setdefault(word.get("lesson_number"), []).append(word)
+        catalog_words.append({
+            "id": str(word["_id"]),
+            "arabic": word["arabic"],
+            "transliteration": word["transliteration"],
+            "meaning": word["meaning"]
+        })
+    _catalog_words[:] = catalog_words
+    
+    _lesson_word_ids.clear()
+    _word_lesson_numbers.clear()
+    _lesson_words.clear()
+    _lesson_words_json.clear()
+    for lesson_number, words in lesson_words.items():
+        word_ids = [str(word["_id"]) for word in words]
+        if lesson_number in LESSON_NUMBERS:
+            _lesson_word_ids[lesson_number] = word_ids
+            _word_lesson_numbers.update(dict.fromkeys(word_ids, lesson_number))
+        _lesson_words[lesson_number] = [
+            {
+                "id": word_id,
+                "arabic": word["arabic"],
+                "transliteration": word["transliteration"],
+                "meaning": word["meaning"],
+                "example_verse": word.get("example_verse")
+            }
+            for word_id, word in zip(word_ids, words)
+        ]
+        body = orjson.dumps(_lesson_words[lesson_number])
+        _lesson_words_json[lesson_number] = (body, '"' + hashlib.md5(body).hexdigest() + '"')
+
+async def ensure_lesson_catalog():
+    """Load the catalog if the database was seeded after this worker started"""
+    if not _catalog_words:
+        await load_lesson_catalog()
+
 # Initialize comprehensive data including advanced features
 @app.on_event("startup")
 async def initialize_data():
+    # Size the worker thread pool that runs blocking work such as password hashing
+    anyio.to_thread.current_default_thread_limiter().total_tokens = 2 * (os.cpu_count() or 1)
+    
+    # uvicorn runs on uvloop whenever it is installed (see requirements)
+    logger.info(f"Event loop: {type(asyncio.get_running_loop()).__module__}")
+    
+    # Open the first Mongo connection now rather than on the first request
+    await db.command("ping")
+    
     # Initialize all advanced systems with database
     advanced_features.db = db
     
@@ -180,191 +337,40 @@ async def initialize_data():
     gamification_system = ComprehensiveGamificationSystem(db)
     ai_tutoring_engine.db = db
     
-    # Initialize Peace TV integration
-    await initialize_peace_tv_integration(db)
-    
-    # Initialize AI Ustaz Assistant
-    await initialize_ai_ustaz_assistant(db)
-    
-    # Initialize Integrated Guidance System
-    await initialize_integrated_guidance_system(db)
-    
-    # Initialize Full Quran Database
-    await initialize_full_quran_database(db)
-    
-    # Initialize Speech Recognition System
-    await initialize_speech_recognition(db)
-    
-    # Initialize Advanced Analytics Engine
-    await initialize_analytics_engine(db)
+    # Each subsystem only wires up its own module state and indexes, so they
+    # can all start concurrently
+    await asyncio.gather(
+        initialize_peace_tv_integration(db),
+        initialize_ai_ustaz_assistant(db),
+        initialize_integrated_guidance_system(db),
+        initialize_full_quran_database(db),
+        initialize_speech_recognition(db),
+        initialize_analytics_engine(db),
+        initialize_social_system(db),
+        initialize_subscription_system(db),
+        initialize_rich_media_system(db)
+    )
     
-    # Initialize Social Learning System
-    await initialize_social_system(db)
+    # Indexes backing the per-user progress and lesson word queries; the
+    # unique (user_id, word_id) index is built by seed_db.py after deduplication
+    await db.user_progress.create_index([("user_id", 1), ("last_practiced", -1)])
+    await db.user_progress.create_index([("user_id", 1), ("mastery_level", 1)])
+    await db.words.create_index("lesson_number")
+    await db.words.create_index("arabic")
+    await db.duas.create_index("category")
+    await db.users.create_index("username", unique=True)
+    await db.users.create_index([("total_words_learned", -1), ("current_streak", -1)])
     
-    # Initialize Subscription System
-    await initialize_subscription_system(db)
+    # Indexes for the per-user spaced repetition and gamification lookups
+    await db.memory_cards.create_index([("user_id", 1), ("word_id", 1)])
+    await db.memory_cards.create_index([("user_id", 1), ("due_date", 1)])
+    await db.user_profiles.create_index("user_id")
+    await db.user_profiles.create_index([("total_xp", -1), ("current_level", -1)])
+    await db.daily_quests.create_index([("user_id", 1), ("date", 1)])
     
-    # Initialize Rich Media System
-    await initialize_rich_media_system(db)
+    # Words and duas are seeded by seed_db.py before the workers start
+    await load_lesson_catalog()
     
-    # Check if words exist
-    word_count = await db.words.count_documents({})
-    if word_count == 0:
-        # Expanded vocabulary with JAKIM/JAIS compliance
-        comprehensive_words = [
-            # Lesson 1 - Al-Fatiha Words (JAKIM Approved)
-            {"arabic": "اللَّهُ", "transliteration": "Allah", "meaning": "God/Allah", "lesson_number": 1, "category": "basic", 
-             "surah": 1, "ayah": 2, "root": "ا-ل-ه", "compliance_level": "jakim_approved"},
-            {"arabic": "رَبُّ", "transliteration": "Rabb", "meaning": "Lord/Sustainer", "lesson_number": 1, "category": "basic",
-             "surah": 1, "ayah": 2, "root": "ر-ب-ب", "compliance_level": "jakim_approved"},
-            {"arabic": "رَحْمَٰنِ", "transliteration": "Rahman", "meaning": "Most Merciful", "lesson_number": 1, "category": "basic",
-             "surah": 1, "ayah": 3, "root": "ر-ح-م", "compliance_level": "jakim_approved"},
-            {"arabic": "رَحِيمِ", "transliteration": "Rahim", "meaning": "Most Compassionate", "lesson_number": 1, "category": "basic",
-             "surah": 1, "ayah": 3, "root": "ر-ح-م", "compliance_level": "jakim_approved"},
-            {"arabic": "مَلِكِ", "transliteration": "Malik", "meaning": "King/Master", "lesson_number": 1, "category": "basic",
-             "surah": 1, "ayah": 4, "root": "م-ل-ك", "compliance_level": "jakim_approved"},
-            {"arabic": "يَوْمِ", "transliteration": "Yawm", "meaning": "Day", "lesson_number": 1, "category": "basic",
-             "surah": 1, "ayah": 4, "root": "ي-و-م", "compliance_level": "jakim_approved"},
-            {"arabic": "دِينِ", "transliteration": "Deen", "meaning": "Judgment/Religion", "lesson_number": 1, "category": "basic",
-             "surah": 1, "ayah": 4, "root": "د-ي-ن", "compliance_level": "jakim_approved"},
-            {"arabic": "نَعْبُدُ", "transliteration": "Na'budu", "meaning": "We worship", "lesson_number": 1, "category": "basic",
-             "surah": 1, "ayah": 5, "root": "ع-ب-د", "compliance_level": "jakim_approved"},
-            {"arabic": "نَسْتَعِينُ", "transliteration": "Nasta'een", "meaning": "We seek help", "lesson_number": 1, "category": "basic",
-             "surah": 1, "ayah": 5, "root": "ع-و-ن", "compliance_level": "jakim_approved"},
-            {"arabic": "صِرَاطَ", "transliteration": "Sirat", "meaning": "Path/Way", "lesson_number": 1, "category": "basic",
-             "surah": 1, "ayah": 6, "root": "ص-ر-ط", "compliance_level": "jakim_approved"},
-            
-            # Lesson 2 - Common Quranic Verbs
-            {"arabic": "قَالَ", "transliteration": "Qala", "meaning": "He said", "lesson_number": 2, "category": "verbs",
-             "root": "ق-و-ل", "compliance_level": "jais_verified"},
-            {"arabic": "كَانَ", "transliteration": "Kana", "meaning": "Was/Were", "lesson_number": 2, "category": "verbs",
-             "root": "ك-و-ن", "compliance_level": "jais_verified"},
-            {"arabic": "جَاءَ", "transliteration": "Jaa'a", "meaning": "He came", "lesson_number": 2, "category": "verbs",
-             "root": "ج-ي-ء", "compliance_level": "jais_verified"},
-            {"arabic": "آمَنَ", "transliteration": "Aamana", "meaning": "He believed", "lesson_number": 2, "category": "verbs",
-             "root": "ا-م-ن", "compliance_level": "jais_verified"},
-            {"arabic": "عَلِمَ", "transliteration": "'Alima", "meaning": "He knew", "lesson_number": 2, "category": "verbs",
-             "root": "ع-ل-م", "compliance_level": "jais_verified"},
-            {"arabic": "سَمِعَ", "transliteration": "Sami'a", "meaning": "He heard", "lesson_number": 2, "category": "verbs",
-             "root": "س-م-ع", "compliance_level": "jais_verified"},
-            {"arabic": "رَأَى", "transliteration": "Ra'a", "meaning": "He saw", "lesson_number": 2, "category": "verbs",
-             "root": "ر-ا-ي", "compliance_level": "jais_verified"},
-            {"arabic": "خَلَقَ", "transliteration": "Khalaqa", "meaning": "He created", "lesson_number": 2, "category": "verbs",
-             "root": "خ-ل-ق", "compliance_level": "jais_verified"},
-            {"arabic": "أَنْزَلَ", "transliteration": "Anzala", "meaning": "He sent down", "lesson_number": 2, "category": "verbs",
-             "root": "ن-ز-ل", "compliance_level": "jais_verified"},
-            {"arabic": "هَدَى", "transliteration": "Hada", "meaning": "He guided", "lesson_number": 2, "category": "verbs",
-             "root": "ه-د-ي", "compliance_level": "jais_verified"},
-            
-            # Lesson 3 - Pronouns & Particles
-            {"arabic": "هُوَ", "transliteration": "Huwa", "meaning": "He", "lesson_number": 3, "category": "pronouns",
-             "root": "ه-و-ا", "compliance_level": "scholarly_reviewed"},
-            {"arabic": "هِيَ", "transliteration": "Hiya", "meaning": "She", "lesson_number": 3, "category": "pronouns",
-             "root": "ه-ي-ا", "compliance_level": "scholarly_reviewed"},
-            {"arabic": "أَنْتَ", "transliteration": "Anta", "meaning": "You (masculine)", "lesson_number": 3, "category": "pronouns",
-             "root": "ا-ن-ت", "compliance_level": "scholarly_reviewed"},
-            {"arabic": "أَنَا", "transliteration": "Ana", "meaning": "I", "lesson_number": 3, "category": "pronouns",
-             "root": "ا-ن-ا", "compliance_level": "scholarly_reviewed"},
-            {"arabic": "نَحْنُ", "transliteration": "Nahnu", "meaning": "We", "lesson_number": 3, "category": "pronouns",
-             "root": "ن-ح-ن", "compliance_level": "scholarly_reviewed"},
-            {"arabic": "مِنْ", "transliteration": "Min", "meaning": "From", "lesson_number": 3, "category": "particles",
-             "root": "م-ن", "compliance_level": "scholarly_reviewed"},
-            {"arabic": "إِلَىٰ", "transliteration": "Ila", "meaning": "To/Towards", "lesson_number": 3, "category": "particles",
-             "root": "ا-ل-ي", "compliance_level": "scholarly_reviewed"},
-            {"arabic": "فِي", "transliteration": "Fee", "meaning": "In", "lesson_number": 3, "category": "particles",
-             "root": "ف-ي", "compliance_level": "scholarly_reviewed"},
-            {"arabic": "عَلَىٰ", "transliteration": "'Ala", "meaning": "On/Upon", "lesson_number": 3, "category": "particles",
-             "root": "ع-ل-ي", "compliance_level": "scholarly_reviewed"},
-            {"arabic": "بِسْمِ", "transliteration": "Bismi", "meaning": "In the name of", "lesson_number": 3, "category": "particles",
-             "root": "س-م-و", "compliance_level": "jakim_approved"},
-             
-            # Lesson 4 - Beautiful Names of Allah (99 Names Sample)
-            {"arabic": "الْعَلِيمُ", "transliteration": "Al-Aleem", "meaning": "The All-Knowing", "lesson_number": 4, "category": "names_of_allah",
-             "root": "ع-ل-م", "compliance_level": "jakim_approved"},
-            {"arabic": "الْحَكِيمُ", "transliteration": "Al-Hakeem", "meaning": "The Wise", "lesson_number": 4, "category": "names_of_allah",
-             "root": "ح-ك-م", "compliance_level": "jakim_approved"},
-            {"arabic": "الْغَفُورُ", "transliteration": "Al-Ghafoor", "meaning": "The Forgiving", "lesson_number": 4, "category": "names_of_allah",
-             "root": "غ-ف-ر", "compliance_level": "jakim_approved"},
-            {"arabic": "الصَّبُورُ", "transliteration": "As-Saboor", "meaning": "The Patient", "lesson_number": 4, "category": "names_of_allah",
-             "root": "ص-ب-ر", "compliance_level": "jakim_approved"},
-            {"arabic": "الْكَرِيمُ", "transliteration": "Al-Kareem", "meaning": "The Generous", "lesson_number": 4, "category": "names_of_allah",
-             "root": "ك-ر-م", "compliance_level": "jakim_approved"},
-            {"arabic": "الرَّزَّاقُ", "transliteration": "Ar-Razzaq", "meaning": "The Provider", "lesson_number": 4, "category": "names_of_allah",
-             "root": "ر-ز-ق", "compliance_level": "jakim_approved"},
-            {"arabic": "الْخَالِقُ", "transliteration": "Al-Khaliq", "meaning": "The Creator", "lesson_number": 4, "category": "names_of_allah",
-             "root": "خ-ل-ق", "compliance_level": "jakim_approved"},
-            {"arabic": "الْمَالِكُ", "transliteration": "Al-Malik", "meaning": "The King", "lesson_number": 4, "category": "names_of_allah",
-             "root": "م-ل-ك", "compliance_level": "jakim_approved"},
-            {"arabic": "الْقُدُّوسُ", "transliteration": "Al-Quddoos", "meaning": "The Holy", "lesson_number": 4, "category": "names_of_allah",
-             "root": "ق-د-س", "compliance_level": "jakim_approved"},
-            {"arabic": "السَّلَامُ", "transliteration": "As-Salaam", "meaning": "The Peace", "lesson_number": 4, "category": "names_of_allah",
-             "root": "س-ل-م", "compliance_level": "jakim_approved"},
-             
-            # Lesson 5 - Islamic Terms & Concepts  
-            {"arabic": "صَلَاة", "transliteration": "Salah", "meaning": "Prayer", "lesson_number": 5, "category": "worship",
-             "root": "ص-ل-ي", "compliance_level": "jakim_approved"},
-            {"arabic": "زَكَاة", "transliteration": "Zakah", "meaning": "Charity/Alms", "lesson_number": 5, "category": "worship",
-             "root": "ز-ك-و", "compliance_level": "jakim_approved"},
-            {"arabic": "حَجّ", "transliteration": "Hajj", "meaning": "Pilgrimage", "lesson_number": 5, "category": "worship",
-             "root": "ح-ج-ج", "compliance_level": "jakim_approved"},
-            {"arabic": "صَوْم", "transliteration": "Sawm", "meaning": "Fasting", "lesson_number": 5, "category": "worship",
-             "root": "ص-و-م", "compliance_level": "jakim_approved"},
-            {"arabic": "إِيمَان", "transliteration": "Iman", "meaning": "Faith/Belief", "lesson_number": 5, "category": "concept",
-             "root": "ا-م-ن", "compliance_level": "jakim_approved"},
-            {"arabic": "إِسْلَام", "transliteration": "Islam", "meaning": "Submission to Allah", "lesson_number": 5, "category": "concept",
-             "root": "س-ل-م", "compliance_level": "jakim_approved"},
-            {"arabic": "تَقْوَى", "transliteration": "Taqwa", "meaning": "God-consciousness", "lesson_number": 5, "category": "concept",
-             "root": "و-ق-ي", "compliance_level": "jakim_approved"},
-            {"arabic": "جَنَّة", "transliteration": "Jannah", "meaning": "Paradise", "lesson_number": 5, "category": "concept",
-             "root": "ج-ن-ن", "compliance_level": "jakim_approved"},
-            {"arabic": "رَحْمَة", "transliteration": "Rahmah", "meaning": "Mercy", "lesson_number": 5, "category": "concept",
-             "root": "ر-ح-م", "compliance_level": "jakim_approved"},
-            {"arabic": "هِدَايَة", "transliteration": "Hidayah", "meaning": "Guidance", "lesson_number": 5, "category": "concept",
-             "root": "ه-د-ي", "compliance_level": "jakim_approved"}
-        ]
-        
-        # Verify each word for Islamic compliance before insertion
-        verified_words = []
-        for word in comprehensive_words:
-            compliance_check = islamic_compliance.verify_quranic_content(
-                word["arabic"], 
-                word.get("surah", 1), 
-                word.get("ayah", 1)
-            )
-            word["compliance_verified"] = True
-            word["verification_date"] = datetime.utcnow()
-            verified_words.append(word)
-        
-        await db.words.insert_many(verified_words)
-        logger.info(f"Initialized {len(verified_words)} verified Islamic words")
-        
-    # Initialize Islamic supplications (Duas) - JAKIM approved
-    dua_count = await db.duas.count_documents({})
-    if dua_count == 0:
-        islamic_duas = [
-            {
-                "name": "Dua for Knowledge",
-                "arabic": "رَبِّ زِدْنِي عِلْمًا",
-                "transliteration": "Rabbi zidni 'ilma",
-                "meaning": "My Lord, increase me in knowledge",
-                "reference": "Quran 20:114",
-                "category": "learning",
-                "compliance_level": "jakim_approved"
-            },
-            {
-                "name": "Dua Before Study",
-                "arabic": "اللَّهُمَّ انْفَعْنِي بِمَا عَلَّمْتَنِي وَعَلِّمْنِي مَا يَنْفَعُنِي وَزِدْنِي عِلْمًا",
-                "transliteration": "Allahumma anfa'ni bima 'allamtani wa 'allimni ma yanfa'uni wa zidni 'ilma",
-                "meaning": "O Allah, benefit me with what You have taught me, teach me what will benefit me, and increase me in knowledge",
-                "reference": "Hadith",
-                "category": "learning",
-                "compliance_level": "jakim_approved"
-            }
-        ]
-        
-        await db.duas.insert_many(islamic_duas)
-        logger.info("Initialized Islamic supplications (Duas)")
-        
     logger.info("Advanced Islamic learning system initialized with JAKIM/JAIS compliance")
 
 # Auth Routes
@@ -375,8 +381,8 @@ async def register(user_data: UserRegister):
     if existing_user:
         raise HTTPException(status_code=400, detail="Username already exists")
     
-    # Hash password
-    hashed_password = bcrypt.hashpw(user_data.password.encode('utf-8'), bcrypt.gensalt())
+    # Hash password off the event loop; bcrypt is deliberately slow
+    hashed_password = await run_in_threadpool(bcrypt.hashpw, user_data.password.encode('utf-8'), bcrypt.gensalt(rounds=BCRYPT_ROUNDS))
     
     # Create user
     user_doc = {
@@ -386,14 +392,18 @@ async def register(user_data: UserRegister):
         "current_streak": 0,
         "last_activity": None,
         "total_words_learned": 0,
-        "total_lessons_completed": 0
+        "total_lessons_completed": 0,
+        "mastery_sum": 0,
+        "progress_count": 0,
+        "words_practiced_today": 0,
+        "practice_day": None
     }
     
     result = await db.users.insert_one(user_doc)
     user_doc["_id"] = result.inserted_id
     
     # Generate token
-    access_token = create_access_token(data={"sub": str(result.inserted_id)})
+    access_token = create_access_token(data=user_token_claims(user_doc))
     
     return {
         "access_token": access_token,
@@ -412,11 +422,11 @@ async def login(user_data: UserLogin):
         raise HTTPException(status_code=401, detail="Invalid username or password")
     
     # Verify password
-    if not bcrypt.checkpw(user_data.password.encode('utf-8'), user["password"].encode('utf-8')):
+    if not await run_in_threadpool(bcrypt.checkpw, user_data.password.encode('utf-8'), user["password"].encode('utf-8')):
         raise HTTPException(status_code=401, detail="Invalid username or password")
     
     # Generate token
-    access_token = create_access_token(data={"sub": str(user["_id"])})
+    access_token = create_access_token(data=user_token_claims(user))
     
     return {
         "access_token": access_token,
@@ -428,81 +438,73 @@ async def login(user_data: UserLogin):
     }
 
 # Dashboard Route
-@api_router.get("/dashboard", response_model=DashboardStats)
+@api_router.get("/dashboard", responses={200: {"model": DashboardStats}})
 async def get_dashboard(current_user: dict = Depends(get_current_user)):
-    user_id = str(current_user["_id"])
-    
-    # Get user progress
-    progress_items = await db.user_progress.find({"user_id": user_id}).to_list(1000)
+    # Progress totals are maintained on the user document by complete_lesson
+    totals = await db.users.find_one({"_id": current_user["_id"]}, _PROGRESS_TOTALS_PROJECTION) or {}
     
     # Calculate stats
-    words_learned = len([p for p in progress_items if p.get("mastery_level", 0) >= 50])
-    
-    # Check streak
-    last_activity = current_user.get("last_activity")
-    current_streak = current_user.get("current_streak", 0)
+    words_learned = totals.get("total_words_learned", 0)
+    progress_count = totals.get("progress_count", 0)
+    avg_mastery = totals.get("mastery_sum", 0) / progress_count if progress_count else 0
     
     # Words practiced today
-    today = datetime.utcnow().date()
-    words_today = len([p for p in progress_items if p.get("last_practiced") and p["last_practiced"].date() == today])
-    
-    # Calculate overall mastery
-    if progress_items:
-        avg_mastery = sum([p.get("mastery_level", 0) for p in progress_items]) / len(progress_items)
+    if totals.get("practice_day") == datetime.now(timezone.utc).date().isoformat():
+        words_today = totals.get("words_practiced_today", 0)
     else:
-        avg_mastery = 0
+        words_today = 0
+    
+    # Check streak
+    current_streak = totals.get("current_streak", 0)
     
     # Get next lesson
-    completed_lessons = current_user.get("total_lessons_completed", 0)
+    completed_lessons = totals.get("total_lessons_completed", 0)
     next_lesson_num = completed_lessons + 1
     
     next_lesson = None
-    if next_lesson_num <= 3:
-        lesson_words = await db.words.find({"lesson_number": next_lesson_num}).to_list(100)
-        if lesson_words:
+    if next_lesson_num <= MAX_LESSON:
+        lesson_word_count = len(_lesson_word_ids.get(next_lesson_num, ()))
+        if lesson_word_count:
             next_lesson = {
                 "lesson_number": next_lesson_num,
-                "word_count": len(lesson_words)
+                "word_count": lesson_word_count
             }
     
-    return {
+    return ORJSONResponse({
         "total_words_learned": words_learned,
         "current_streak": current_streak,
-        "total_lessons_completed": current_user.get("total_lessons_completed", 0),
+        "total_lessons_completed": completed_lessons,
         "mastery_percentage": round(avg_mastery, 1),
         "words_practiced_today": words_today,
         "next_lesson": next_lesson
-    }
+    })
 
 # Lesson Routes
-@api_router.get("/lessons", response_model=List[LessonResponse])
+@api_router.get("/lessons", responses={200: {"model": List[LessonResponse]}})
 async def get_lessons(current_user: dict = Depends(get_current_user)):
-    user_id = str(current_user["_id"])
-    
-    lessons = [
-        {"number": 1, "title": "Basic Words", "description": "Learn fundamental Quranic terms"},
-        {"number": 2, "title": "Common Verbs", "description": "Master frequently used verbs"},
-        {"number": 3, "title": "Pronouns & Particles", "description": "Understand connecting words"},
-    ]
+    # Lesson word ids are static, so a single progress query covers every lesson
+    lesson_stats = {number: [0, 0, 0] for number in LESSON_NUMBERS}  # progressed, below threshold, total mastery
+    async for progress in db.user_progress.find(
+        {"user_id": current_user["_id"], "word_id": {"$in": list(_word_lesson_numbers)}},
+        {"word_id": 1, "mastery_level": 1, "_id": 0}
+    ):
+        stats = lesson_stats[_word_lesson_numbers[progress["word_id"]]]
+        mastery_level = progress.get("mastery_level", 0)
+        stats[0] += 1
+        stats[1] += mastery_level < 30
+        stats[2] += mastery_level
     
     result = []
-    for lesson in lessons:
-        # Get words for this lesson
-        lesson_words = await db.words.find({"lesson_number": lesson["number"]}).to_list(100)
-        word_ids = [str(w["_id"]) for w in lesson_words]
-        
-        # Get user progress for these words
-        progress = await db.user_progress.find({
-            "user_id": user_id,
-            "word_id": {"$in": word_ids}
-        }).to_list(1000)
+    for lesson in LESSONS:
+        progressed, below_threshold, total_mastery = lesson_stats[lesson["number"]]
+        word_count = len(_lesson_word_ids.get(lesson["number"], ()))
         
         # Calculate completion
-        is_completed = len(progress) >= len(lesson_words) and all(p.get("mastery_level", 0) >= 30 for p in progress)
+        is_completed = progressed >= word_count and not below_threshold
         
         # Calculate mastery percentage
-        if progress:
-            mastery = sum([p.get("mastery_level", 0) for p in progress]) / len(lesson_words)
+        if progressed:
+            mastery = total_mastery / word_count
         else:
             mastery = 0
         
@@ -511,28 +513,30 @@ async def get_lessons(current_user: dict = Depends(get_current_user)):
             "lesson_number": lesson["number"],
             "title": lesson["title"],
             "description": lesson["description"],
-            "word_count": len(lesson_words),
+            "word_count": word_count,
             "estimated_minutes": 15,
             "is_completed": is_completed,
             "mastery_percentage": round(mastery, 1)
         })
     
-    return result
+    # Rows are built by hand, so skip response model validation and encoding
+    return ORJSONResponse(result)
 
-@api_router.get("/lessons/{lesson_number}", response_model=List[WordInLesson])
-async def get_lesson_words(lesson_number: int, current_user: dict = Depends(get_current_user)):
-    words = await db.words.find({"lesson_number": lesson_number}).to_list(100)
-    
-    return [
-        {
-            "id": str(word["_id"]),
-            "arabic": word["arabic"],
-            "transliteration": word["transliteration"],
-            "meaning": word["meaning"],
-            "example_verse": word.get("example_verse")
-        }
-        for word in words
-    ]
+@api_router.get("/lessons/{lesson_number}", responses={200: {"model": List[WordInLesson]}})
+async def get_lesson_words(
+    lesson_number: int,
+    if_none_match: Optional[str] = Header(None),
+    current_user: dict = Depends(get_current_user)
+):
+    # Served from the body serialized at startup; lesson words never change
+    # at runtime, so clients may cache them and revalidate by ETag
+    if lesson_number not in _lesson_words_json:
+        await ensure_lesson_catalog()
+    body, etag = _lesson_words_json.get(lesson_number, _EMPTY_LESSON_WORDS)
+    headers = {"Cache-Control": _LESSON_WORDS_CACHE_CONTROL, "ETag": etag}
+    if if_none_match == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 @api_router.post("/lessons/complete")
 async def complete_lesson(completion: LessonComplete, current_user: dict = Depends(get_current_user)):
@@ -545,87 +549,118 @@ async def complete_lesson(completion: LessonComplete, current_user: dict = Depen
     lesson_score = (correct_answers / total_answers * 100) if total_answers > 0 else 0
     lesson_response_time = getattr(completion, 'response_time', 60.0)
     
-    # Update progress for each word with adaptive learning integration
+    now = datetime.now(timezone.utc)
+    today = now.date()
+    # Stored datetimes are read back naive (UTC), so compare against a naive bound
+    today_start = datetime.combine(today, datetime.min.time())
+    answers_by_word = {}
     for answer in completion.answers:
-        existing_progress = await db.user_progress.find_one({
-            "user_id": user_id,
-            "word_id": answer.word_id
-        })
-        
-        if existing_progress:
-            # Update existing progress
-            correct_count = existing_progress.get("correct_count", 0)
-            total_attempts = existing_progress.get("total_attempts", 0)
-            
-            if answer.is_correct:
-                correct_count += 1
-            total_attempts += 1
-            
-            # Calculate mastery level (0-100)
-            mastery_level = min(100, (correct_count / total_attempts) * 100)
-            
-            await db.user_progress.update_one(
-                {"_id": existing_progress["_id"]},
-                {
-                    "$set": {
-                        "mastery_level": mastery_level,
-                        "last_practiced": datetime.utcnow(),
-                        "correct_count": correct_count,
-                        "total_attempts": total_attempts,
-                        "response_time": getattr(answer, 'response_time', 30.0)
-                    }
-                }
-            )
-        else:
-            # Create new progress entry
-            mastery_level = 100 if answer.is_correct else 0
-            await db.user_progress.insert_one({
-                "user_id": user_id,
-                "word_id": answer.word_id,
-                "mastery_level": mastery_level,
-                "last_practiced": datetime.utcnow(),
-                "correct_count": 1 if answer.is_correct else 0,
-                "total_attempts": 1,
-                "response_time": getattr(answer, 'response_time', 30.0)
-            })
-        
-        # Update adaptive learning system for each word
-        if adaptive_learning_engine:
-            word_response_time = getattr(answer, 'response_time', 30.0)
-            difficulty_rating = 5.0 - (lesson_score / 25.0)  # Convert score to difficulty (1-5 scale)
-            
-            await adaptive_learning_engine.process_review_result(
-                user_id, answer.word_id, answer.is_correct, word_response_time, difficulty_rating
-            )
+        answers_by_word.setdefault(answer.word_id, []).append(answer)
     
-    # Update user stats
-    progress_items = await db.user_progress.find({"user_id": user_id}).to_list(1000)
-    words_learned = len([p for p in progress_items if p.get("mastery_level", 0) >= 50])
+    async def record_word_progress(word_id, word_answers):
+        """Upsert one word's progress; the counters are incremented server-side
+        and mastery derived from them, and the document as it was before this
+        update gives the exact change to the user's progress totals"""
+        correct = sum(1 for answer in word_answers if answer.is_correct)
+        attempts = len(word_answers)
+        before = await db.user_progress.find_one_and_update(
+            {"user_id": current_user["_id"], "word_id": word_id},
+            [
+                {"$set": {
+                    "correct_count": {"$add": [{"$ifNull": ["$correct_count", 0]}, correct]},
+                    "total_attempts": {"$add": [{"$ifNull": ["$total_attempts", 0]}, attempts]},
+                    "last_practiced": now,
+                    "response_time": getattr(word_answers[-1], 'response_time', 30.0)
+                }},
+                {"$set": {
+                    # Mastery level (0-100)
+                    "mastery_level": {"$min": [100, {"$multiply": [
+                        {"$divide": ["$correct_count", "$total_attempts"]}, 100
+                    ]}]}
+                }}
+            ],
+            projection={"word_id": 1, "correct_count": 1, "total_attempts": 1, "mastery_level": 1, "last_practiced": 1, "_id": 0},
+            upsert=True,
+            return_document=ReturnDocument.BEFORE
+        ) or {}
+        mastery_before = before.get("mastery_level", 0)
+        total_correct = before.get("correct_count", 0) + correct
+        total_attempts = before.get("total_attempts", 0) + attempts
+        mastery_after = min(100, total_correct / total_attempts * 100)
+        last_practiced = before.get("last_practiced")
+        return (
+            int(mastery_after >= 50) - int(mastery_before >= 50),
+            mastery_after - mastery_before,
+            int(not before),
+            int(not (last_practiced and last_practiced >= today_start))
+        )
     
-    # Update streak
-    today = datetime.utcnow().date()
-    last_activity = current_user.get("last_activity")
-    current_streak = current_user.get("current_streak", 0)
+    # Words are written concurrently; each word's answers go in one update
+    word_deltas = await asyncio.gather(*(
+        record_word_progress(word_id, word_answers) for word_id, word_answers in answers_by_word.items()
+    ))
+    words_learned_delta = sum(delta[0] for delta in word_deltas)
+    mastery_sum_delta = sum(delta[1] for delta in word_deltas)
+    new_progress_count = sum(delta[2] for delta in word_deltas)
+    practiced_today_delta = sum(delta[3] for delta in word_deltas)
     
-    if last_activity:
-        last_date = last_activity.date()
-        if (today - last_date).days == 1:
-            current_streak += 1
-        elif (today - last_date).days > 1:
-            current_streak = 1
-    else:
-        current_streak = 1
+    # Update adaptive learning system for each word; words are reviewed
+    # concurrently, repeated answers for one word stay in order
+    if adaptive_learning_engine:
+        difficulty_rating = 5.0 - (lesson_score / 25.0)  # Convert score to difficulty (1-5 scale)
+        
+        async def review_word(word_answers):
+            for answer in word_answers:
+                word_response_time = getattr(answer, 'response_time', 30.0)
+                await adaptive_learning_engine.process_review_result(
+                    user_id, answer.word_id, answer.is_correct, word_response_time, difficulty_rating
+                )
+        
+        await asyncio.gather(*(review_word(word_answers) for word_answers in answers_by_word.values()))
     
-    await db.users.update_one(
+    # Update user stats; progress totals are kept on the user document so the
+    # dashboard never has to scan progress. The streak is derived from the
+    # stored last activity in the same update, so concurrent sessions agree
+    practice_day = today.isoformat()
+    # Users who were never active count as last active at the epoch
+    last_active_day = {"$dateToString": {
+        "format": "%Y-%m-%d", "date": {"$ifNull": ["$last_activity", datetime(1970, 1, 1)]}
+    }}
+    stored_streak = {"$ifNull": ["$current_streak", 0]}
+    updated_user = await db.users.find_one_and_update(
         {"_id": current_user["_id"]},
-        {
-            "$set": {
-                "last_activity": datetime.utcnow(),
-                "current_streak": current_streak,
-                "total_words_learned": words_learned
-            }
-        }
-    )
+        [{"$set": {
+            "last_activity": now,
+            "current_streak": {"$switch": {
+                "branches": [
+                    # Already active today
+                    {"case": {"$gte": [last_active_day, practice_day]}, "then": stored_streak},
+                    # Active yesterday
+                    {"case": {"$eq": [last_active_day, (today - timedelta(days=1)).isoformat()]},
+                     "then": {"$add": [stored_streak, 1]}}
+                ],
+                "default": 1
+            }},
+            "total_words_learned": {"$add": [{"$ifNull": ["$total_words_learned", 0]}, words_learned_delta]},
+            "mastery_sum": {"$add": [{"$ifNull": ["$mastery_sum", 0]}, mastery_sum_delta]},
+            "progress_count": {"$add": [{"$ifNull": ["$progress_count", 0]}, new_progress_count]},
+            "words_practiced_today": {"$cond": [
+                {"$eq": ["$practice_day", practice_day]},
+                {"$add": ["$words_practiced_today", practiced_today_delta]},
+                len(answers_by_word)
+            ]},
+            "practice_day": practice_day,
+            "cards_updated_at": now
+        }}],
+        projection={"total_words_learned": 1, "current_streak": 1, "_id": 0},
+        return_document=ReturnDocument.AFTER
+    ) or {}
+    words_learned = updated_user.get("total_words_learned", 0)
+    current_streak = updated_user.get("current_streak", 0)
+    
+    # Progress changed, so cached user and Peace TV recommendations are stale
+    invalidate_cached_user(user_id)
+    peace_tv_integration.invalidate_user_recommendations(user_id)
     
     # ========================================
     # REVOLUTIONARY GAMIFICATION INTEGRATION
@@ -643,10 +678,7 @@ async def complete_lesson(completion: LessonComplete, current_user: dict = Depen
         total_xp = base_xp + speed_bonus + streak_bonus + perfect_bonus
         xp_awarded = total_xp
         
-        # Award XP
-        await gamification_system.award_xp(user_id, total_xp, f"Completed lesson with {lesson_score}% score")
-        
-        # Check for achievements
+        # Award XP and check for achievements in one profile update
         activity_data = {
             "lessons_completed": 1,
             "perfect_scores": 1 if lesson_score == 100 else 0,
@@ -656,7 +688,9 @@ async def complete_lesson(completion: LessonComplete, current_user: dict = Depen
             "lesson_score": lesson_score,
             "total_words_learned": words_learned
         }
-        achievements_unlocked = await gamification_system.check_achievements(user_id, activity_data)
+        _, achievements_unlocked = await gamification_system.award_xp_and_check_achievements(
+            user_id, total_xp, f"Completed lesson with {lesson_score}% score", activity_data
+        )
     
     # Return revolutionary response with all system integrations
     return {
@@ -686,31 +720,29 @@ async def complete_lesson(completion: LessonComplete, current_user: dict = Depen
 # Progress Routes
 @api_router.get("/progress/words")
 async def get_word_progress(current_user: dict = Depends(get_current_user)):
-    user_id = str(current_user["_id"])
-    
-    # Get all words with progress
-    all_words = await db.words.find().to_list(1000)
-    progress_items = await db.user_progress.find({"user_id": user_id}).to_list(1000)
-    
     # Create progress map
-    progress_map = {p["word_id"]: p for p in progress_items}
+    progress_map = {}
+    async for p in db.user_progress.find(
+        {"user_id": current_user["_id"]},
+        {"word_id": 1, "mastery_level": 1, "last_practiced": 1, "total_attempts": 1, "_id": 0}
+    ):
+        progress_map[p["word_id"]] = p
     
+    # Get all words with progress, from the catalog loaded at startup; the
+    # words collection itself is never scanned per request
+    await ensure_lesson_catalog()
     result = []
-    for word in all_words:
-        word_id = str(word["_id"])
-        progress = progress_map.get(word_id, {})
+    for word in _catalog_words:
+        progress = progress_map.get(word["id"], {})
         
         result.append({
-            "id": word_id,
-            "arabic": word["arabic"],
-            "transliteration": word["transliteration"],
-            "meaning": word["meaning"],
+            **word,
             "mastery_level": progress.get("mastery_level", 0),
             "last_practiced": progress.get("last_practiced"),
             "total_attempts": progress.get("total_attempts", 0)
         })
     
-    return result
+    return ORJSONResponse(result)
 
 # =============================================
 # ADVANCED FEATURES API ENDPOINTS
@@ -721,12 +753,15 @@ async def get_word_progress(current_user: dict = Depends(get_current_user)):
 async def get_approved_reciters(current_user: dict = Depends(get_current_user)):
     """Get list of JAKIM/JAIS approved reciters"""
     try:
-        reciters = list(advanced_features.approved_reciters.values())
-        return {"reciters": [reciter.dict() for reciter in reciters]}
+        return {"reciters": advanced_features.approved_reciters_data}
     except Exception as e:
         logger.error(f"Error getting reciters: {e}")
         raise HTTPException(status_code=500, detail="Error loading reciters")
 
+# Verse audio metadata never changes, so each verse's response body is kept serialized
+_VERSE_AUDIO_CACHE_MAX_SIZE = 65_536
+_verse_audio_cache: Dict[tuple, bytes] = {}  # (reciter_id, surah, ayah) -> serialized AudioTrack
+
 @api_router.get("/audio/{reciter_id}/{surah}/{ayah}")
 async def get_verse_audio(
     reciter_id: str, 
@@ -736,10 +771,17 @@ async def get_verse_audio(
 ):
     """Get audio for specific verse from approved reciter"""
     try:
-        audio_track = await advanced_features.get_reciter_audio(reciter_id, surah, ayah)
-        if not audio_track:
-            raise HTTPException(status_code=404, detail="Audio not found or not approved")
-        return audio_track.dict()
+        key = (reciter_id, surah, ayah)
+        body = _verse_audio_cache.get(key)
+        if body is None:
+            audio_track = await advanced_features.get_reciter_audio(reciter_id, surah, ayah)
+            if not audio_track:
+                raise HTTPException(status_code=404, detail="Audio not found or not approved")
+            body = orjson.dumps(audio_track.model_dump())
+            if len(_verse_audio_cache) >= _VERSE_AUDIO_CACHE_MAX_SIZE:
+                _verse_audio_cache.pop(next(iter(_verse_audio_cache)))
+            _verse_audio_cache[key] = body
+        return Response(content=body, media_type="application/json")
     except Exception as e:
         logger.error(f"Error getting audio: {e}")
         raise HTTPException(status_code=500, detail="Error loading audio")
@@ -760,7 +802,7 @@ async def get_prayer_times(
             target_date = datetime.utcnow()
             
         prayer_times = await advanced_features.calculate_prayer_times(latitude, longitude, target_date)
-        return prayer_times.dict()
+        return prayer_times.model_dump()
     except ValueError as e:
         raise HTTPException(status_code=400, detail=f"Invalid parameters: {e}")
     except Exception as e:
@@ -790,7 +832,7 @@ async def ask_ai_tutor(
     """Ask AI tutor about Quranic topics (Islamic compliance enforced)"""
     try:
         ai_response = await advanced_features.get_ai_quran_response(question)
-        return ai_response.dict()
+        return ai_response.model_dump()
     except Exception as e:
         logger.error(f"Error getting AI response: {e}")
         raise HTTPException(status_code=500, detail="Error processing question")
@@ -802,9 +844,9 @@ async def get_personalized_study_plan(
     """Get AI-generated personalized study plan"""
     try:
         user_id = str(current_user["_id"])
-        # Determine user level based on progress
-        user_progress = await db.user_progress.find({"user_id": user_id}).to_list(1000)
-        words_learned = len([p for p in user_progress if p.get("mastery_level", 0) >= 50])
+        # Determine user level from the learned word count kept on the user
+        totals = await db.users.find_one({"_id": current_user["_id"]}, {"total_words_learned": 1, "_id": 0}) or {}
+        words_learned = totals.get("total_words_learned", 0)
         
         if words_learned < 20:
             current_level = "beginner"
@@ -855,6 +897,29 @@ async def get_islamic_achievements(current_user: dict = Depends(get_current_user
         raise HTTPException(status_code=500, detail="Error loading achievements")
 
 # Duas & Islamic Content APIs
+# Duas are seeded content, so each category's list is cached for a few minutes
+_DUA_PROJECTION = {"name": 1, "arabic": 1, "transliteration": 1, "meaning": 1, "reference": 1, "category": 1}
+_DUAS_CACHE_TTL_SECONDS = 300
+_DUAS_CACHE_MAX_SIZE = 64
+_duas_cache: Dict[str, tuple] = {}  # category -> (expires at, duas)
+
+async def get_cached_duas(category: str = "all") -> List[dict]:
+    """Get the duas of a category, read through the in-process cache"""
+    now = time.time()
+    cached = _duas_cache.get(category)
+    if cached is not None and cached[0] > now:
+        return cached[1]
+    
+    query = {} if category == "all" else {"category": category}
+    duas = [
+        {**dua, "_id": str(dua["_id"])}
+        async for dua in db.duas.find(query, _DUA_PROJECTION).limit(100)
+    ]
+    if len(_duas_cache) >= _DUAS_CACHE_MAX_SIZE:
+        _duas_cache.pop(next(iter(_duas_cache)))
+    _duas_cache[category] = (now + _DUAS_CACHE_TTL_SECONDS, duas)
+    return duas
+
 @api_router.get("/duas")
 async def get_islamic_duas(
     category: str = "all",
@@ -862,16 +927,8 @@ async def get_islamic_duas(
 ):
     """Get Islamic supplications (Duas) - JAKIM approved"""
     try:
-        if category == "all":
-            duas = await db.duas.find({}).to_list(100)
-        else:
-            duas = await db.duas.find({"category": category}).to_list(100)
-        
-        # Convert ObjectId to string
-        for dua in duas:
-            dua["_id"] = str(dua["_id"])
-            
-        return {"duas": duas, "count": len(duas)}
+        duas = await get_cached_duas(category)
+        return ORJSONResponse({"duas": duas, "count": len(duas)})
     except Exception as e:
         logger.error(f"Error getting duas: {e}")
         raise HTTPException(status_code=500, detail="Error loading duas")
@@ -886,7 +943,8 @@ async def create_advanced_quiz(
     """Create advanced quiz types with different interaction methods"""
     try:
         lesson_number = int(lesson_id.split("_")[-1])
-        words = await db.words.find({"lesson_number": lesson_number}).to_list(100)
+        await ensure_lesson_catalog()
+        words = _lesson_words.get(lesson_number)
         
         if not words:
             raise HTTPException(status_code=404, detail="Lesson not found")
@@ -898,9 +956,11 @@ async def create_advanced_quiz(
             "questions": []
         }
         
-        for word in words:
+        meanings = [word["meaning"] for word in words]
+        distractor_count = min(3, len(words) - 1)
+        for index, word in enumerate(words):
             question = {
-                "word_id": str(word["_id"]),
+                "word_id": word["id"],
                 "arabic": word["arabic"],
                 "transliteration": word["transliteration"],
                 "meaning": word["meaning"]
@@ -923,10 +983,9 @@ async def create_advanced_quiz(
                 
             else:  # multiple_choice (default)
                 # Generate multiple choice options
-                other_words = [w for w in words if w["_id"] != word["_id"]]
-                import random
-                wrong_options = random.sample([w["meaning"] for w in other_words], 3)
-                options = wrong_options + [word["meaning"]]
+                # Sample among the other positions, skipping this word's own
+                wrong_indexes = random.sample(range(len(words) - 1), distractor_count)
+                options = [meanings[i + 1 if i >= index else i] for i in wrong_indexes] + [word["meaning"]]
                 random.shuffle(options)
                 question["options"] = options
                 question["correct_answer"] = word["meaning"]
@@ -939,6 +998,10 @@ async def create_advanced_quiz(
         raise HTTPException(status_code=500, detail="Error creating quiz")
 
 # Community Features API
+# The ranking is shared by every reader, so it is recomputed at most once a minute
+_COMMUNITY_LEADERBOARD_TTL_SECONDS = 60
+_community_leaderboard: tuple = (0.0, [])  # (expires at, ranked entries)
+
 @api_router.get("/community/leaderboard")
 async def get_community_leaderboard(
     timeframe: str = "weekly",  # "daily", "weekly", "monthly", "all_time"
@@ -957,48 +1020,26 @@ async def get_community_leaderboard(
         else:
             start_date = datetime(2020, 1, 1)  # All time
         
-        # Get users with progress in timeframe
-        pipeline = [
-            {
-                "$lookup": {
-                    "from": "user_progress",
-                    "localField": "_id",
-                    "foreignField": "user_id",
-                    "as": "progress"
-                }
-            },
-            {
-                "$addFields": {
-                    "words_learned": {
-                        "$size": {
-                            "$filter": {
-                                "input": "$progress",
-                                "cond": {"$gte": ["$$this.mastery_level", 50]}
-                            }
-                        }
-                    },
-                    "total_study_time": {"$sum": "$progress.total_attempts"}
+        global _community_leaderboard
+        expires_at, leaderboard = _community_leaderboard
+        if expires_at <= time.time():
+            # Users carry their learned word count, so rank straight off the
+            # users index instead of joining every user's progress
+            users = await db.users.find(
+                {},
+                {"username": 1, "total_words_learned": 1, "current_streak": 1, "_id": 0}
+            ).sort([("total_words_learned", -1), ("current_streak", -1)]).to_list(50)
+            # Only public fields are projected
+            leaderboard = [
+                {
+                    "username": user["username"],
+                    "words_learned": user.get("total_words_learned", 0),
+                    "current_streak": user.get("current_streak", 0),
+                    "rank": rank
                 }
-            },
-            {
-                "$sort": {"words_learned": -1, "current_streak": -1}
-            },
-            {
-                "$limit": 50
-            }
-        ]
-        
-        # Execute aggregation on users collection
-        leaderboard = []
-        async for user in db.users.aggregate(pipeline):
-            # Remove sensitive information
-            leaderboard_entry = {
-                "username": user["username"],
-                "words_learned": user.get("words_learned", 0),
-                "current_streak": user.get("current_streak", 0),
-                "rank": len(leaderboard) + 1
-            }
-            leaderboard.append(leaderboard_entry)
+                for rank, user in enumerate(users, start=1)
+            ]
+            _community_leaderboard = (time.time() + _COMMUNITY_LEADERBOARD_TTL_SECONDS, leaderboard)
         
         return {
             "timeframe": timeframe,
@@ -1010,31 +1051,49 @@ async def get_community_leaderboard(
         raise HTTPException(status_code=500, detail="Error loading leaderboard")
 
 # Offline Sync API
+_sync_words_cache: Dict[int, orjson.Fragment] = {}  # highest lesson synced -> serialized words up to it
+
 @api_router.get("/offline/sync-data")
 async def get_offline_sync_data(current_user: dict = Depends(get_current_user)):
     """Get essential data for offline functionality"""
     try:
         user_id = str(current_user["_id"])
         
-        # Get user's lesson progress to determine what content to sync
-        user_progress = await db.user_progress.find({"user_id": user_id}).to_list(1000)
-        
-        # Get current lessons and completed lessons
+        # Get current lessons and completed lessons; progress stores the word
+        # id string, so lessons come from the catalog rather than a words lookup
+        await ensure_lesson_catalog()
         completed_lesson_numbers = set()
-        for progress in user_progress:
-            word = await db.words.find_one({"_id": progress["word_id"]})
-            if word and progress.get("mastery_level", 0) >= 30:
-                completed_lesson_numbers.add(word["lesson_number"])
+        async for progress in db.user_progress.find(
+            {"user_id": current_user["_id"], "mastery_level": {"$gte": 30}},
+            {"word_id": 1, "_id": 0}
+        ):
+            lesson_number = _word_lesson_numbers.get(progress["word_id"])
+            if lesson_number is not None:
+                completed_lesson_numbers.add(lesson_number)
         
         # Determine next lessons to sync (current + 2 ahead)
         max_completed = max(completed_lesson_numbers) if completed_lesson_numbers else 0
         lessons_to_sync = list(range(1, max_completed + 3))  # Current + 2 ahead
         
-        # Get words for these lessons
-        words = await db.words.find({"lesson_number": {"$in": lessons_to_sync}}).to_list(1000)
+        # Get words for these lessons (bounded scan of the lesson_number index),
+        # with only the fields a lesson needs offline; the word lists are the
+        # same for every user at a given lesson, so they are kept serialized
+        # once loaded and spliced into each response as is
+        words = _sync_words_cache.get(lessons_to_sync[-1])
+        if words is None:
+            word_rows = [
+                {**word, "_id": str(word["_id"])}
+                async for word in db.words.find(
+                    {"lesson_number": {"$in": lessons_to_sync}},
+                    {"arabic": 1, "transliteration": 1, "meaning": 1, "example_verse": 1, "lesson_number": 1}
+                ).sort("lesson_number", 1).limit(1000)
+            ]
+            words = orjson.Fragment(orjson.dumps(word_rows))
+            if word_rows:
+                _sync_words_cache[lessons_to_sync[-1]] = words
         
         # Get duas
-        duas = await db.duas.find({}).to_list(50)
+        duas = await get_cached_duas()
         
         # Get prayer time calculation parameters for user's region (if available)
         prayer_params = {
@@ -1044,23 +1103,18 @@ async def get_offline_sync_data(current_user: dict = Depends(get_current_user)):
             "madhab": "shafi"
         }
         
-        # Convert ObjectIds to strings
-        for word in words:
-            word["_id"] = str(word["_id"])
-        for dua in duas:
-            dua["_id"] = str(dua["_id"])
-        
         sync_data = {
             "words": words,
             "duas": duas,
             "prayer_calculation_params": prayer_params,
-            "approved_reciters": [reciter.dict() for reciter in advanced_features.approved_reciters.values()],
+            "approved_reciters": advanced_features.approved_reciters_data,
             "islamic_achievements": islamic_compliance.get_halal_achievement_system(),
             "sync_timestamp": datetime.utcnow().isoformat(),
             "version": "1.0"
         }
         
-        return sync_data
+        # Everything is already JSON-ready, so skip FastAPI's encoding pass
+        return ORJSONResponse(sync_data)
     except Exception as e:
         logger.error(f"Error getting sync data: {e}")
         raise HTTPException(status_code=500, detail="Error preparing offline data")
@@ -1127,7 +1181,9 @@ async def generate_personalized_exercises(
 # Adaptive Learning & Spaced Repetition System
 @api_router.get("/adaptive-learning/due-reviews")
 async def get_adaptive_due_reviews(
+    response: Response,
     limit: int = 20,
+    if_none_match: Optional[str] = Header(None),
     current_user: dict = Depends(get_current_user)
 ):
     """Get words due for review using advanced SRS algorithm"""
@@ -1137,6 +1193,29 @@ async def get_adaptive_due_reviews(
         if not adaptive_learning_engine:
             raise HTTPException(status_code=500, detail="Adaptive learning system not initialized")
         
+        # Due reviews only change when the user's cards change or as time
+        # passes, so repeat polls within the hour revalidate by ETag. The next
+        # upcoming due date is part of the validator, so a card falling due
+        # inside the hour changes the ETag on the next poll
+        cards_state, next_due = await asyncio.gather(
+            db.users.find_one({"_id": current_user["_id"]}, {"cards_updated_at": 1, "_id": 0}),
+            db.memory_cards.find_one(
+                {"user_id": user_id, "due_date": {"$gt": datetime.utcnow()}},
+                {"due_date": 1, "_id": 0},
+                sort=[("due_date", 1)]
+            )
+        )
+        cards_updated_at = (cards_state or {}).get("cards_updated_at")
+        next_due_date = (next_due or {}).get("due_date")
+        hour_bucket = int(time.time() // 3600)
+        etag = '"' + hashlib.md5(
+            f"{user_id}:{cards_updated_at}:{limit}:{hour_bucket}:{next_due_date}".encode()
+        ).hexdigest() + '"'
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if if_none_match == etag:
+            return Response(status_code=304, headers=headers)
+        response.headers.update(headers)
+        
         due_reviews = await adaptive_learning_engine.get_due_reviews(user_id, limit)
         
         return {
@@ -1169,29 +1248,31 @@ async def submit_adaptive_review_result(
         updated_card = await adaptive_learning_engine.process_review_result(
             user_id, word_id, is_correct, response_time, difficulty_rating
         )
+        # Changes the user's due reviews, see get_adaptive_due_reviews
+        await db.users.update_one({"_id": current_user["_id"]}, {"$set": {"cards_updated_at": datetime.utcnow()}})
         
         # Award XP based on performance
         xp_award = 50 if is_correct else 10
         if gamification_system:
-            await gamification_system.award_xp(user_id, xp_award, "Completed adaptive review")
-            
-            # Check for achievements
+            # Award XP and check for achievements in one profile update
             activity_data = {
                 "words_learned": updated_card.repetitions if is_correct else 0,
                 "perfect_scores": 1 if is_correct else 0,
                 "fastest_quiz_time": response_time
             }
-            achievements = await gamification_system.check_achievements(user_id, activity_data)
+            _, achievements = await gamification_system.award_xp_and_check_achievements(
+                user_id, xp_award, "Completed adaptive review", activity_data
+            )
             
             return {
-                "updated_card": updated_card.dict(),
+                "updated_card": updated_card.model_dump(),
                 "xp_awarded": xp_award,
                 "achievements_unlocked": achievements,
                 "next_review_date": updated_card.due_date.isoformat()
             }
         
         return {
-            "updated_card": updated_card.dict(),
+            "updated_card": updated_card.model_dump(),
             "next_review_date": updated_card.due_date.isoformat()
         }
         
@@ -1258,10 +1339,10 @@ async def get_gamification_profile(current_user: dict = Depends(get_current_user
             raise HTTPException(status_code=500, detail="Gamification system not initialized")
         
         profile = await gamification_system.get_user_profile(user_id)
-        statistics = await gamification_system.get_user_statistics(user_id)
+        statistics = await gamification_system.get_user_statistics(user_id, profile)
         
         return {
-            "profile": profile.dict(),
+            "profile": profile.model_dump(),
             "statistics": statistics,
             "system": "Revolutionary Gamification Engine"
         }
@@ -1279,25 +1360,26 @@ async def get_all_achievements(current_user: dict = Depends(get_current_user)):
         if not gamification_system:
             raise HTTPException(status_code=500, detail="Gamification system not initialized")
         
-        profile = await gamification_system.get_user_profile(user_id)
+        # Only the unlocked ids are needed here
+        profile = await gamification_system.get_user_profile(
+            user_id, {"user_id": 1, "achievements_unlocked": 1, "_id": 0}
+        )
         all_achievements = gamification_system.achievements
         
-        achievements_with_status = []
-        for achievement_id, achievement in all_achievements.items():
-            achievements_with_status.append({
-                "id": achievement_id,
-                "achievement": achievement.__dict__,
-                "unlocked": achievement_id in profile.achievements_unlocked,
-                "progress": 0  # TODO: Calculate progress toward achievement
-            })
-        
-        # Group by category
-        categorized_achievements = {}
-        for achievement_data in achievements_with_status:
-            category = achievement_data["achievement"]["category"]
-            if category not in categorized_achievements:
-                categorized_achievements[category] = []
-            categorized_achievements[category].append(achievement_data)
+        # Overlay the user's unlock status on the catalog grouped at startup
+        unlocked = set(profile.achievements_unlocked)
+        categorized_achievements = {
+            category: [
+                {
+                    "id": achievement_id,
+                    "achievement": achievement,
+                    "unlocked": achievement_id in unlocked,
+                    "progress": 0  # TODO: Calculate progress toward achievement
+                }
+                for achievement_id, achievement in achievements
+            ]
+            for category, achievements in gamification_system.achievements_by_category.items()
+        }
         
         return {
             "achievements_by_category": categorized_achievements,
@@ -1404,8 +1486,6 @@ async def get_learning_recommendations(current_user: dict = Depends(get_current_
         
         # Get gamification insights
         if gamification_system:
-            profile = await gamification_system.get_user_profile(user_id)
-            
             recommendations["gamification_insights"] = {
                 "next_achievement": "vocabulary_builder",  # TODO: Calculate actual next achievement
                 "xp_to_next_level": 500,  # TODO: Calculate from profile
@@ -1436,20 +1516,40 @@ async def get_comprehensive_dashboard(current_user: dict = Depends(get_current_u
             "recommendations": {}
         }
         
-        # Get basic stats (existing dashboard)
-        user_progress = await db.user_progress.find({"user_id": user_id}).to_list(1000)
-        words_learned = len([p for p in user_progress if p.get("mastery_level", 0) >= 50])
+        async def load_adaptive_learning():
+            analytics = await adaptive_learning_engine.get_user_learning_analytics(user_id)
+            due_reviews = await adaptive_learning_engine.get_due_reviews(user_id, 5)
+            return analytics, due_reviews
+        
+        async def load_gamification():
+            return await asyncio.gather(
+                gamification_system.get_user_profile(user_id),
+                gamification_system.create_daily_quests(user_id)
+            )
+        
+        async def skip():
+            return None
+        
+        # The subsystems are independent, so load them concurrently
+        user_stats, adaptive_data, gamification_data = await asyncio.gather(
+            db.users.find_one(
+                {"_id": current_user["_id"]}, {"total_words_learned": 1, "current_streak": 1, "_id": 0}
+            ),
+            load_adaptive_learning() if adaptive_learning_engine else skip(),
+            load_gamification() if gamification_system else skip()
+        )
+        user_stats = user_stats or {}
         
+        # Get basic stats (existing dashboard)
         dashboard_data["basic_stats"] = {
-            "words_learned": words_learned,
+            "words_learned": user_stats.get("total_words_learned", 0),
             "total_lessons": 5,
-            "current_streak": current_user.get("current_streak", 0)
+            "current_streak": user_stats.get("current_streak", 0)
         }
         
         # Get adaptive learning data
-        if adaptive_learning_engine:
-            analytics = await adaptive_learning_engine.get_user_learning_analytics(user_id)
-            due_reviews = await adaptive_learning_engine.get_due_reviews(user_id, 5)
+        if adaptive_data:
+            analytics, due_reviews = adaptive_data
             
             dashboard_data["adaptive_learning"] = {
                 "analytics": analytics,
@@ -1458,9 +1558,8 @@ async def get_comprehensive_dashboard(current_user: dict = Depends(get_current_u
             }
         
         # Get gamification data
-        if gamification_system:
-            profile = await gamification_system.get_user_profile(user_id)
-            daily_quests = await gamification_system.create_daily_quests(user_id)
+        if gamification_data:
+            profile, daily_quests = gamification_data
             
             dashboard_data["gamification"] = {
                 "level": profile.current_level,
@@ -1667,15 +1766,15 @@ async def track_peace_tv_engagement(
                 completion_bonus = 10
             
             total_xp = base_xp + completion_bonus
-            await gamification_system.award_xp(user_id, total_xp, f"Watched Peace TV content ({completion_percentage}% completed)")
-            
-            # Check for video watching achievements
+            # Award XP and check for video watching achievements in one profile update
             activity_data = {
                 "videos_watched": 1,
                 "watch_time_minutes": watch_duration / 60,
                 "completion_percentage": completion_percentage
             }
-            achievements = await gamification_system.check_achievements(user_id, activity_data)
+            _, achievements = await gamification_system.award_xp_and_check_achievements(
+                user_id, total_xp, f"Watched Peace TV content ({completion_percentage}% completed)", activity_data
+            )
             
             return {
                 "success": True,
@@ -1792,14 +1891,17 @@ async def get_ai_ustaz_guidance(
             raise HTTPException(status_code=500, detail="AI Ustaz Assistant not initialized")
         
         # Get user's current progress for contextualized guidance
-        user_progress = await db.user_progress.find({"user_id": user_id}).to_list(100)
-        total_lessons_completed = current_user.get("total_lessons_completed", 0)
-        current_streak = current_user.get("current_streak", 0)
+        user_stats = await db.users.find_one(
+            {"_id": current_user["_id"]},
+            {"total_lessons_completed": 1, "current_streak": 1, "total_words_learned": 1, "_id": 0}
+        ) or {}
+        total_lessons_completed = user_stats.get("total_lessons_completed", 0)
+        current_streak = user_stats.get("current_streak", 0)
         
         user_data = {
             "total_lessons_completed": total_lessons_completed,
             "current_streak": current_streak,
-            "words_learned": len([p for p in user_progress if p.get("mastery_level", 0) >= 50]),
+            "words_learned": user_stats.get("total_words_learned", 0),
             "user_level": "beginner" if total_lessons_completed < 3 else "intermediate" if total_lessons_completed < 10 else "advanced"
         }
         
@@ -2113,7 +2215,8 @@ async def get_persona_information(current_user: dict = Depends(get_current_user)
         user_id = str(current_user["_id"])
         
         # Determine persona based on user gender
-        user_gender = current_user.get("gender", UserGender.NOT_SPECIFIED)
+        user_doc = await db.users.find_one({"_id": current_user["_id"]}, {"gender": 1, "_id": 0}) or {}
+        user_gender = user_doc.get("gender", UserGender.NOT_SPECIFIED)
         persona = PersonaType.USTAZAH if user_gender == UserGender.FEMALE else PersonaType.USTAZ
         
         persona_info = {
@@ -2571,13 +2674,7 @@ async def track_integrated_learning_session(
         
         # Award XP through gamification system
         if gamification_system:
-            await gamification_system.award_xp(
-                user_id, 
-                total_xp, 
-                f"Completed integrated learning session ({session_duration_minutes} min)"
-            )
-            
-            # Check for session-related achievements
+            # Award XP and check for session-related achievements in one profile update
             activity_data = {
                 "integrated_sessions": 1,
                 "session_duration": session_duration_minutes,
@@ -2585,7 +2682,12 @@ async def track_integrated_learning_session(
                 "guidance_used": ustaz_guidance_used,
                 "goals_achieved": len(learning_goals_achieved)
             }
-            achievements = await gamification_system.check_achievements(user_id, activity_data)
+            _, achievements = await gamification_system.award_xp_and_check_achievements(
+                user_id, 
+                total_xp, 
+                f"Completed integrated learning session ({session_duration_minutes} min)",
+                activity_data
+            )
         else:
             achievements = []
         
@@ -3263,7 +3365,8 @@ async def check_feature_access(
     """🔒 Check if user has access to a premium feature"""
     try:
         # Get user's subscription tier (default to FREE)
-        user_tier = current_user.get("subscription_tier", SubscriptionTier.FREE)
+        user_doc = await db.users.find_one({"_id": current_user["_id"]}, {"subscription_tier": 1, "_id": 0}) or {}
+        user_tier = user_doc.get("subscription_tier", SubscriptionTier.FREE)
         
         try:
             feature_enum = FeatureAccess(feature)
@@ -3392,4 +3495,6 @@ logger = logging.getLogger(__name__)
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    await shutdown_peace_tv_integration()
+    await shutdown_rich_media_system()
     client.close()
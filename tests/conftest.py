@@ -0,0 +1,19 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+
+# Backend modules import each other by bare name, as when run from backend/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+# server.py reads its database settings at import
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "think_quran_test")
+
+
+@pytest.fixture
+def db():
+    """A fresh in-memory database per test"""
+    return AsyncMongoMockClient()["think_quran_test"]
@@ -0,0 +1,103 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+
+import server
+from server import LessonComplete, QuizAnswer
+
+
+@pytest.fixture
+def user(db, monkeypatch):
+    monkeypatch.setattr(server, "db", db)
+    user = {"_id": ObjectId(), "username": "student"}
+    # The fields register() creates every user with
+    asyncio.run(db.users.insert_one({
+        **user,
+        "current_streak": 0,
+        "last_activity": None,
+        "total_words_learned": 0,
+        "total_lessons_completed": 0,
+        "mastery_sum": 0,
+        "progress_count": 0,
+        "words_practiced_today": 0,
+        "practice_day": None
+    }))
+    return user
+
+
+def _complete(user, *answers):
+    completion = LessonComplete(
+        lesson_id="lesson_1",
+        answers=[QuizAnswer(word_id=word_id, is_correct=is_correct, time_spent=5) for word_id, is_correct in answers],
+        total_time=60
+    )
+    return asyncio.run(server.complete_lesson(completion, user))
+
+
+def _user_doc(db, user):
+    return asyncio.run(db.users.find_one({"_id": user["_id"]}))
+
+
+def _set_last_activity(db, user, last_activity, streak):
+    asyncio.run(db.users.update_one(
+        {"_id": user["_id"]}, {"$set": {"last_activity": last_activity, "current_streak": streak}}
+    ))
+
+
+def test_first_time_words_add_to_the_totals(db, user):
+    result = _complete(user, ("w1", True), ("w2", False))
+
+    totals = _user_doc(db, user)
+    assert totals["progress_count"] == 2
+    assert totals["total_words_learned"] == 1
+    assert totals["mastery_sum"] == 100
+    assert totals["words_practiced_today"] == 2
+    assert result["words_learned"] == 1
+    assert asyncio.run(db.user_progress.count_documents({"user_id": user["_id"]})) == 2
+
+
+def test_repeat_words_only_add_their_change(db, user):
+    _complete(user, ("w1", True), ("w2", False))
+    # w1 drops to 50% and stays learned, w2 rises to 50% and becomes learned
+    _complete(user, ("w1", False), ("w2", True))
+
+    totals = _user_doc(db, user)
+    assert totals["progress_count"] == 2
+    assert totals["total_words_learned"] == 2
+    assert totals["mastery_sum"] == 100
+    assert totals["words_practiced_today"] == 2
+    assert asyncio.run(db.user_progress.count_documents({"user_id": user["_id"]})) == 2
+
+
+def test_repeated_answers_for_one_word_are_one_upsert(db, user):
+    _complete(user, ("w1", True), ("w1", True), ("w1", False))
+
+    progress = asyncio.run(db.user_progress.find_one({"user_id": user["_id"], "word_id": "w1"}))
+    assert progress["correct_count"] == 2
+    assert progress["total_attempts"] == 3
+    assert _user_doc(db, user)["progress_count"] == 1
+
+
+def test_streak_starts_at_one(db, user):
+    assert _complete(user, ("w1", True))["current_streak"] == 1
+
+
+def test_streak_continues_from_yesterday(db, user):
+    _set_last_activity(db, user, datetime.utcnow() - timedelta(days=1), 4)
+
+    assert _complete(user, ("w1", True))["current_streak"] == 5
+
+
+def test_streak_resets_after_a_missed_day(db, user):
+    _set_last_activity(db, user, datetime.utcnow() - timedelta(days=3), 4)
+
+    assert _complete(user, ("w1", True))["current_streak"] == 1
+
+
+def test_streak_unchanged_on_the_same_day(db, user):
+    _set_last_activity(db, user, datetime.utcnow(), 4)
+
+    assert _complete(user, ("w1", True))["current_streak"] == 4
+    assert _complete(user, ("w2", True))["current_streak"] == 4
@@ -0,0 +1,81 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+from pymongo.errors import PyMongoError
+
+import rich_media_system
+from rich_media_system import RichMediaSystem, initialize_rich_media_system, shutdown_rich_media_system
+
+
+def _fake_db():
+    db = MagicMock()
+    db.media_progress.bulk_write = AsyncMock()
+    return db
+
+
+def _written(db):
+    """(filter, $set fields) for every UpdateOne sent to bulk_write"""
+    return [
+        (op._filter, op._doc["$set"])
+        for call in db.media_progress.bulk_write.await_args_list
+        for op in call.args[0]
+    ]
+
+
+def test_initialize_attaches_db_to_the_imported_instance():
+    imported = rich_media_system.rich_media_system
+    db = _fake_db()
+
+    async def run():
+        await initialize_rich_media_system(db)
+        try:
+            await imported.track_media_progress("u1", "c1", 40.0)
+            await imported.flush_progress()
+        finally:
+            await shutdown_rich_media_system()
+            await initialize_rich_media_system(None)
+
+    asyncio.run(run())
+
+    assert rich_media_system.rich_media_system is imported
+    [(query, fields)] = _written(db)
+    assert query == {"user_id": "u1", "content_id": "c1"}
+    assert fields["progress_percentage"] == 40.0
+    assert fields["completed"] is False
+
+
+def test_pings_for_one_content_merge_into_a_single_monotonic_write():
+    db = _fake_db()
+    system = RichMediaSystem(db)
+
+    async def run():
+        await system.track_media_progress("u1", "c1", 70.0)
+        await system.track_media_progress("u1", "c1", 30.0)
+        await system.track_media_progress("u1", "c2", 10.0, completed=True)
+        await system.flush_progress()
+
+    asyncio.run(run())
+
+    written = dict((query["content_id"], fields) for query, fields in _written(db))
+    assert db.media_progress.bulk_write.await_count == 1
+    assert written["c1"]["progress_percentage"] == 70.0
+    assert written["c2"]["completed"] is True
+
+
+def test_failed_flush_is_requeued_without_losing_newer_progress():
+    db = _fake_db()
+    system = RichMediaSystem(db)
+
+    async def run():
+        await system.track_media_progress("u1", "c1", 20.0)
+        db.media_progress.bulk_write.side_effect = PyMongoError("down")
+        await system.flush_progress()
+        await system.track_media_progress("u1", "c1", 60.0)
+        db.media_progress.bulk_write.side_effect = None
+        db.media_progress.bulk_write.reset_mock()
+        await system.flush_progress()
+
+    asyncio.run(run())
+
+    [(_, fields)] = _written(db)
+    assert fields["progress_percentage"] == 60.0
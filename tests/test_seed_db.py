@@ -0,0 +1,43 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
+
+from seed_db import dedupe_progress
+
+
+def test_dedupe_keeps_one_row_per_user_and_word(db):
+    alice, bob = ObjectId(), ObjectId()
+    # BSON dates hold milliseconds
+    now = datetime.utcnow().replace(microsecond=0)
+    asyncio.run(db.user_progress.insert_many([
+        {"user_id": alice, "word_id": "w1", "mastery_level": 40, "last_practiced": now},
+        {"user_id": alice, "word_id": "w1", "mastery_level": 80, "last_practiced": now - timedelta(days=2)},
+        {"user_id": alice, "word_id": "w1", "mastery_level": 80, "last_practiced": now - timedelta(days=1)},
+        {"user_id": alice, "word_id": "w2", "mastery_level": 10, "last_practiced": now},
+        {"user_id": bob, "word_id": "w1", "mastery_level": 20, "last_practiced": now}
+    ]))
+
+    asyncio.run(dedupe_progress(db))
+
+    rows = asyncio.run(db.user_progress.find({}, {"_id": 0}).to_list(None))
+    kept = {(row["user_id"], row["word_id"]): row for row in rows}
+    assert len(rows) == len(kept) == 3
+    # Highest mastery wins, then the latest practice among equal mastery
+    assert kept[(alice, "w1")]["mastery_level"] == 80
+    assert kept[(alice, "w1")]["last_practiced"] == now - timedelta(days=1)
+    assert kept[(bob, "w1")]["mastery_level"] == 20
+
+
+def test_dedupe_creates_the_unique_progress_index(db):
+    user_id = ObjectId()
+    asyncio.run(db.user_progress.insert_one({"user_id": user_id, "word_id": "w1", "mastery_level": 50}))
+
+    asyncio.run(dedupe_progress(db))
+    # Re-running on deduplicated data is a no-op
+    asyncio.run(dedupe_progress(db))
+
+    with pytest.raises(DuplicateKeyError):
+        asyncio.run(db.user_progress.insert_one({"user_id": user_id, "word_id": "w1", "mastery_level": 0}))